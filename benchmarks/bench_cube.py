@@ -0,0 +1,84 @@
+"""Benchmark: Analytics tab aggregations, per-rerun pandas vs the precomputed cube.
+
+    python -m benchmarks.bench_cube --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics_cube import AnalyticsCube, CubeBase, density_sample
+from labels import MALAYSIA_LABELS
+
+CITIES = [f'City {i:02d}' for i in range(30)]
+
+
+def synthetic_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    score = np.round(rng.uniform(0, 100, n), 2)
+    return pd.DataFrame({
+        'city': pd.Categorical(rng.choice(CITIES, n)),
+        'halal_certified_area': rng.random(n) < 0.7,
+        'median_income_myr': rng.integers(4000, 9000, n),
+        'AI_Score': score,
+        'Verdict': MALAYSIA_LABELS.verdict(MALAYSIA_LABELS.codes(score)),
+    })
+
+
+def pandas_analytics(df):
+    """The original Analytics tab: value_counts, pd.cut histogram and the raw scatter frame."""
+    df['Verdict'].value_counts()
+    df['city'].value_counts().head(10)
+    pd.cut(df['AI_Score'], bins=10).value_counts().sort_index()
+    df[['median_income_myr', 'AI_Score']].rename(columns={'median_income_myr': 'Income', 'AI_Score': 'Score'})
+
+
+def cube_analytics(cube, df, verdicts, cities, lo, hi):
+    selection = cube.select(verdicts, cities, lo, hi)
+    cube.verdict_counts(selection, verdicts)
+    cube.city_counts(selection).head(10)
+    cube.score_histogram(selection, lo)
+    density_sample(df['median_income_myr'], df['AI_Score'])
+
+
+def _best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[2000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    verdicts, cities = MALAYSIA_LABELS.verdicts, CITIES[:20]
+    print(f"{'rows':>12} {'pandas ms':>10} {'base ms':>8} {'rebuild ms':>11} {'query ms':>9} {'query+scatter ms':>17}")
+    for n in args.rows:
+        df = synthetic_frame(n)
+        filtered = df[df['city'].isin(cities)]
+        t_pandas = _best_of(lambda: pandas_analytics(filtered), args.repeat)
+        t_base = _best_of(lambda: CubeBase(df['city'], df['halal_certified_area']), args.repeat)
+        base = CubeBase(df['city'], df['halal_certified_area'])
+        scores, codes = df['AI_Score'].to_numpy(), df['Verdict'].cat.codes.to_numpy()
+        income = df['median_income_myr'].to_numpy()
+        build = lambda: AnalyticsCube(base, scores, codes, verdicts, {'income': income})
+        t_rebuild = _best_of(build, args.repeat)
+        cube = build()
+        selection = cube.select(verdicts, cities)
+        t_query = _best_of(lambda: (cube.verdict_counts(selection), cube.city_counts(selection),
+                                    cube.score_histogram(selection)), args.repeat)
+        t_full = _best_of(lambda: cube_analytics(cube, filtered, verdicts, cities, 0, 100), args.repeat)
+        print(f"{n:>12,} {t_pandas * 1e3:>10.2f} {t_base * 1e3:>8.2f} {t_rebuild * 1e3:>11.2f} "
+              f"{t_query * 1e3:>9.2f} {t_full * 1e3:>17.2f}")
+
+        assert cube.city_counts(selection).sum() == len(filtered)
+
+
+if __name__ == '__main__':
+    main()
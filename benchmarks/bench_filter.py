@@ -0,0 +1,86 @@
+"""Benchmark: sidebar filter latency, boolean-mask scans vs precomputed position indexes.
+
+    python -m benchmarks.bench_filter --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from filter_index import CategoryIndex, ScoreIndex, intersect_positions
+
+BANDS = {'Sangat Cocok': (70, np.inf), 'Cocok': (40, 70), 'Tidak Cocok': (-np.inf, 40)}
+CITIES = [f'City {i:02d}' for i in range(30)]
+
+
+def synthetic_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    score = np.round(rng.uniform(0, 100, n), 2)
+    return pd.DataFrame({
+        'city': pd.Categorical(rng.choice(CITIES, n)),
+        'halal_certified_area': rng.random(n) < 0.7,
+        'AI_Score': score,
+        'Verdict': np.select([score >= 70, score >= 40], ['Sangat Cocok', 'Cocok'], 'Tidak Cocok'),
+    })
+
+
+def mask_filter(df, verdicts, cities, lo, hi, halal_only):
+    """The original malaysia.py filter: full-column scans every rerun."""
+    mask = (df['Verdict'].isin(verdicts) & df['city'].isin(cities) &
+            (df['AI_Score'] >= lo) & (df['AI_Score'] <= hi))
+    if halal_only:
+        mask &= df['halal_certified_area'] == 1
+    return np.flatnonzero(mask.to_numpy())
+
+
+def index_filter(n, city_index, score_index, halal_positions, verdicts, cities, lo, hi, halal_only):
+    sets = [score_index.band_positions([BANDS[v] for v in verdicts], lo, hi), city_index.positions(cities)]
+    if halal_only:
+        sets.append(halal_positions)
+    return intersect_positions(n, sets)
+
+
+def _best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    start = time.perf_counter()
+    city_index = CategoryIndex(df['city'])
+    halal_positions = np.flatnonzero(df['halal_certified_area'].to_numpy())
+    t_static = time.perf_counter() - start
+    start = time.perf_counter()
+    score_index = ScoreIndex(df['AI_Score'].to_numpy())
+    t_score = time.perf_counter() - start
+    print(f"{args.rows:,} rows: static index build {t_static * 1e3:.1f} ms, "
+          f"score index (per weight change) {t_score * 1e3:.1f} ms")
+
+    scenarios = [
+        ('5 cities, all verdicts', list(BANDS), CITIES[:5], 0, 100, False),
+        ('5 cities, halal, 40-80', list(BANDS), CITIES[:5], 40, 80, True),
+        ('all cities, top verdict', ['Sangat Cocok'], CITIES, 0, 100, False),
+        ('1 city, halal, top verdict', ['Sangat Cocok'], CITIES[:1], 75, 100, True),
+    ]
+    print(f"{'scenario':>28} {'rows out':>10} {'mask ms':>9} {'index ms':>9}")
+    for name, verdicts, cities, lo, hi, halal in scenarios:
+        t_mask, expected = _best_of(lambda: mask_filter(df, verdicts, cities, lo, hi, halal), args.repeat)
+        t_index, got = _best_of(lambda: index_filter(len(df), city_index, score_index, halal_positions,
+                                                     verdicts, cities, lo, hi, halal), args.repeat)
+        assert np.array_equal(expected, got), name
+        print(f"{name:>28} {len(got):>10,} {t_mask * 1e3:>9.2f} {t_index * 1e3:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Benchmark: generator loop lama vs engine vectorized (rows/sec).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_generate --sizes 20000 1000000
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import generate_data
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 20000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=50000,
+                        help="Loop lama hanya dijalankan sampai ukuran ini (terlalu lambat di atasnya)")
+    parser.add_argument("--chunk-size", type=int, default=generate_data.CHUNK_SIZE)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'engine':>10} {'seconds':>10} {'rows/sec':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "bench.csv")
+        for n in args.sizes:
+            if n <= args.legacy_max:
+                t = _timed(generate_data.generate_indonesia_dataset, n, out)
+                print(f"{n:>12,} {'loop':>10} {t:>10.2f} {n / t:>14,.0f}")
+            t = _timed(generate_data.generate_indonesia_dataset_fast, n, out, args.chunk_size, 0)
+            print(f"{n:>12,} {'vector':>10} {t:>10.2f} {n / t:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Microbenchmark: verdict/grade labelling, Series.apply lambda vs LabelScheme (np.digitize).
+
+    python -m benchmarks.bench_labels --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from labels import INDONESIA_LABELS, MALAYSIA_LABELS
+
+
+def apply_verdict(scores):
+    """The original malaysia.py labelling."""
+    return scores.apply(lambda x: 'Sangat Cocok' if x >= 70 else ('Cocok' if x >= 40 else 'Tidak Cocok'))
+
+
+def _best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[2000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'apply ms':>10} {'digitize ms':>12} {'full label ms':>14}")
+    for n in args.rows:
+        scores = pd.Series(np.round(np.random.default_rng(0).uniform(0, 100, n), 2))
+        t_apply, expected = _best_of(lambda: apply_verdict(scores), args.repeat)
+        t_codes, got = _best_of(lambda: MALAYSIA_LABELS.verdict(MALAYSIA_LABELS.codes(scores)), args.repeat)
+        t_label, _ = _best_of(lambda: INDONESIA_LABELS.label(scores), args.repeat)
+        assert (expected.to_numpy() == np.asarray(got, dtype=object)).all()
+        print(f"{n:>10,} {t_apply * 1e3:>10.2f} {t_codes * 1e3:>12.2f} {t_label * 1e3:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
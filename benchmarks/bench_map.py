@@ -0,0 +1,43 @@
+"""Benchmark: folium map build + HTML render time and payload bytes vs row count,
+per-row Marker layer vs the single FastMarkerCluster payload.
+
+    python -m benchmarks.bench_map --sizes 500 2000 10000 100000
+"""
+import argparse
+import time
+
+import folium
+import numpy as np
+
+import generate_data
+from map_layers import add_fast_marker_layer, add_marker_layer
+
+
+def _render(add_layer, df):
+    start = time.perf_counter()
+    m = folium.Map(location=[df['Latitude'].mean(), df['Longitude'].mean()], zoom_start=12)
+    add_layer(m, df)
+    html = m.get_root().render()
+    return time.perf_counter() - start, len(html.encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 10000, 100000])
+    parser.add_argument('--marker-max', type=int, default=10000,
+                        help='Skip the per-row Marker layer above this size (too slow)')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'layer':>8} {'seconds':>9} {'payload KB':>11} {'bytes/row':>10}")
+    for n in args.sizes:
+        df = generate_data.generate_indonesia_chunk(np.random.default_rng(0), 0, n)
+        layers = [('fast', add_fast_marker_layer)]
+        if n <= args.marker_max:
+            layers.insert(0, ('marker', add_marker_layer))
+        for name, add_layer in layers:
+            elapsed, size = _render(add_layer, df)
+            print(f"{n:>10,} {name:>8} {elapsed:>9.3f} {size / 1024:>11.1f} {size / n:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark: resident memory per dashboard replica, full load vs memory-mapped projection.
+
+Starts N replica processes at once (like N Streamlit servers on one host), each
+loading the dataset the way the app does, and reports per-process Rss / Pss /
+private anonymous memory from /proc/<pid>/smaps_rollup (Linux only). Pss splits
+shared page-cache pages between the processes mapping them. "baseline" is an
+empty projection, i.e. the interpreter + imports.
+
+    python -m benchmarks.bench_mmap --rows 1000000 --replicas 4
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing as mp
+import os
+import tempfile
+
+import generate_data
+from data_store import load_dataset, open_mapped
+
+MAP_COLUMNS = ['Location_ID', 'Latitude', 'Longitude', 'Avg_Income', 'Traffic_Daily',
+               'Competitors', 'Rent_Per_Year', 'Grade', 'Verdict']
+
+
+def _smaps_rollup():
+    stats = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss', 'Anonymous'):
+                stats[key] = int(rest.split()[0]) / 1024
+    return stats
+
+
+def _replica(mode, csv_path, barrier, results):
+    if mode == 'baseline':
+        df = open_mapped(csv_path).frame([])
+    elif mode == 'full':
+        df = load_dataset(csv_path)
+    else:
+        df = open_mapped(csv_path).frame(MAP_COLUMNS)
+    # Touch every column like a render would
+    for col in df.columns:
+        df[col].to_numpy()
+        if df[col].dtype.kind in 'if':
+            df[col].sum()
+    barrier.wait()  # measure only while every replica is alive
+    results.put(_smaps_rollup())
+    barrier.wait()
+
+
+def run(mode, csv_path, replicas):
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(replicas)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_replica, args=(mode, csv_path, barrier, results)) for _ in range(replicas)]
+    for p in procs:
+        p.start()
+    stats = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {k: sum(s[k] for s in stats) / len(stats) for k in stats[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--replicas', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'dummy.csv')
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_data.generate_indonesia_dataset_fast(args.rows, csv_path, seed=0)
+        open_mapped(csv_path)  # build the .arrow copy once, outside the measurement
+
+        print(f"{args.rows:,} rows, {args.replicas} replicas (MB per replica)")
+        print(f"{'mode':>8} {'Rss':>9} {'Pss':>9} {'Anon':>9}")
+        for mode in ('baseline', 'full', 'mapped'):
+            s = run(mode, csv_path, args.replicas)
+            print(f"{mode:>8} {s['Rss']:>9.1f} {s['Pss']:>9.1f} {s['Anonymous']:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
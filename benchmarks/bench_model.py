@@ -0,0 +1,57 @@
+"""Benchmark: XGBoost hist training time and batched inference latency.
+
+    python -m benchmarks.bench_model --rows 10000 1000000 10000000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from model import DEFAULT_PARAMS, predict, train
+from scoring import INDONESIA_SIGNS
+
+
+def synthetic_features(n, seed=0):
+    """Indonesia-like features plus a noisy linear target on the 0-100 scale."""
+    rng = np.random.default_rng(seed)
+    X = np.empty((n, 4), dtype=np.float32)
+    X[:, 0] = rng.integers(2000, 30000, n)
+    X[:, 1] = rng.integers(2_800_000, 12_000_000, n)
+    X[:, 2] = rng.integers(15_000_000, 137_000_000, n)
+    X[:, 3] = rng.integers(0, 150, n)
+    scaled = (X - X.min(axis=0)) / np.ptp(X, axis=0)
+    y = 50 + 25 * scaled @ np.asarray(INDONESIA_SIGNS, dtype=np.float32) + rng.normal(0, 5, n).astype(np.float32)
+    return X, y
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    print(f"hist, {args.rounds} rounds, {args.threads} threads")
+    print(f"{'rows':>12} {'train s':>9} {'R²':>7} {'predict ms':>11} {'rows/sec':>14} {'1-row ms':>9}")
+    for n in args.rows:
+        X, y = synthetic_features(n)
+        booster, metrics = train(X, y, {**DEFAULT_PARAMS, 'nthread': args.threads}, args.rounds)
+
+        start = time.perf_counter()
+        predict(booster, X)
+        t_pred = time.perf_counter() - start
+
+        single = X[:1]
+        predict(booster, single)
+        start = time.perf_counter()
+        for _ in range(100):
+            predict(booster, single)
+        t_one = (time.perf_counter() - start) / 100
+
+        print(f"{n:>12,} {metrics['train_seconds']:>9.2f} {metrics['r2']:>7.3f} {t_pred * 1e3:>11.1f} "
+              f"{n / t_pred:>14,.0f} {t_one * 1e3:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark: per-interaction re-scoring, MinMaxScaler refit vs cached matrix + mat-vec.
+
+    python -m benchmarks.bench_scoring --rows 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+from scoring import MALAYSIA_FEATURES, MALAYSIA_SIGNS, MALAYSIA_WEIGHT_KEYS, normalize_features, score, weight_vector
+
+WEIGHTS = {'population': 0.3, 'income': 0.25, 'mall': 0.2, 'office': 0.15, 'tourism': 0.1, 'competitor': 0.2}
+
+
+def synthetic_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'population_density': rng.integers(5000, 15000, n),
+        'median_income_myr': rng.integers(4000, 9000, n),
+        'mall_density_index': rng.uniform(0.5, 4.0, n),
+        'office_density_index': rng.uniform(0.5, 5.0, n),
+        'tourism_score': rng.uniform(20, 85, n),
+        'competitor_count': rng.integers(5, 80, n),
+    })
+
+
+def refit_scores(df, weights):
+    """The original calculate_scores(): scaler refit + DataFrame on every call."""
+    scaled = pd.DataFrame(MinMaxScaler().fit_transform(df[MALAYSIA_FEATURES]), columns=MALAYSIA_FEATURES)
+    raw = sum(scaled[c] * weights[k] * s for c, k, s in zip(MALAYSIA_FEATURES, MALAYSIA_WEIGHT_KEYS, MALAYSIA_SIGNS))
+    return ((raw - raw.min()) / (raw.max() - raw.min()) * 100).round(2)
+
+
+def _best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[2000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'refit ms':>10} {'precompute ms':>14} {'mat-vec ms':>11}")
+    for n in args.rows:
+        df = synthetic_frame(n)
+        w = weight_vector(WEIGHTS, MALAYSIA_WEIGHT_KEYS, MALAYSIA_SIGNS)
+        t_refit = _best_of(lambda: refit_scores(df, WEIGHTS), args.repeat)
+        t_pre = _best_of(lambda: normalize_features(df, MALAYSIA_FEATURES), args.repeat)
+        X = normalize_features(df, MALAYSIA_FEATURES)
+        t_score = _best_of(lambda: score(X, w), args.repeat)
+        print(f"{n:>12,} {t_refit * 1e3:>10.2f} {t_pre * 1e3:>14.2f} {t_score * 1e3:>11.2f}")
+
+        diff = np.abs(refit_scores(df, WEIGHTS).to_numpy() - score(X, w)).max()
+        assert diff < 0.05, diff
+
+
+if __name__ == '__main__':
+    main()
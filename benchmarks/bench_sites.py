@@ -0,0 +1,52 @@
+"""Benchmark: top-K site selection with spacing / per-city limits vs sorting the whole frame.
+
+    python -m benchmarks.bench_sites --rows 1000000 --k 100 500
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from site_selection import select_sites
+
+
+def synthetic_candidates(n, cities=30, seed=0):
+    """Points jittered ±0.015° around city centres, like regenerate_dataset.py."""
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform([1.0, 100.0], [6.5, 119.0], (cities, 2))
+    city = rng.integers(0, cities, n)
+    return pd.DataFrame({
+        'city': pd.Categorical(city),
+        'latitude': centres[city, 0] + rng.normal(0, 0.015, n),
+        'longitude': centres[city, 1] + rng.normal(0, 0.015, n),
+        'AI_Score': np.round(rng.uniform(0, 100, n), 2),
+    })
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[2000, 1000000])
+    parser.add_argument('--k', type=int, nargs='+', default=[20, 100, 500])
+    parser.add_argument('--min-km', type=float, default=2.0)
+    parser.add_argument('--per-city', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'K':>5} {'sort ms':>9} {'select ms':>10} {'picked':>7}")
+    for n in args.rows:
+        df = synthetic_candidates(n)
+        scores, lat, lon = df['AI_Score'].to_numpy(), df['latitude'].to_numpy(), df['longitude'].to_numpy()
+        t_sort, _ = _timed(lambda: df.sort_values('AI_Score', ascending=False).head(max(args.k)))
+        for k in args.k:
+            t_select, picked = _timed(lambda: select_sites(scores, lat, lon, k, args.min_km, df['city'], args.per_city))
+            print(f"{n:>12,} {k:>5} {t_sort * 1e3:>9.1f} {t_select * 1e3:>10.1f} {len(picked):>7}")
+
+
+if __name__ == '__main__':
+    main()
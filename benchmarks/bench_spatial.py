@@ -0,0 +1,58 @@
+"""Benchmark: KD-tree competitor features vs naive pairwise haversine.
+
+    python -m benchmarks.bench_spatial --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+import generate_data
+from spatial_index import EARTH_RADIUS_KM, competitor_features
+
+
+def naive_nearest_and_count(lat, lon, radius_km, block=2000):
+    """O(n^2) reference: full haversine distance matrix in row blocks."""
+    phi, lam = np.radians(lat), np.radians(lon)
+    nearest = np.empty(len(lat))
+    counts = np.empty(len(lat), dtype=np.int64)
+    for start in range(0, len(lat), block):
+        p, l = phi[start:start + block, None], lam[start:start + block, None]
+        a = np.sin((phi - p) / 2) ** 2 + np.cos(p) * np.cos(phi) * np.sin((lam - l) / 2) ** 2
+        d = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+        d[np.arange(len(p)), np.arange(start, start + len(p))] = np.inf
+        nearest[start:start + block] = d.min(axis=1)
+        counts[start:start + block] = (d <= radius_km).sum(axis=1)
+    return nearest, counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--naive-max', type=int, default=20000)
+    parser.add_argument('--radius-km', type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'method':>9} {'seconds':>9} {'growth exp':>11}")
+    prev = None
+    for n in args.sizes:
+        df = generate_data.generate_indonesia_chunk(np.random.default_rng(0), 0, n)
+        lat, lon = df['Latitude'].to_numpy(), df['Longitude'].to_numpy()
+
+        start = time.perf_counter()
+        features = competitor_features(lat, lon, args.radius_km)
+        elapsed = time.perf_counter() - start
+        exp = np.log(elapsed / prev[1]) / np.log(n / prev[0]) if prev else float('nan')
+        print(f"{n:>10,} {'kdtree':>9} {elapsed:>9.2f} {exp:>11.2f}")
+        prev = (n, elapsed)
+
+        if n <= args.naive_max:
+            start = time.perf_counter()
+            nearest, counts = naive_nearest_and_count(lat, lon, args.radius_km)
+            print(f"{n:>10,} {'naive':>9} {time.perf_counter() - start:>9.2f} {'2.00':>11}")
+            assert np.allclose(nearest, features['nearest'], atol=1e-3)
+            assert np.array_equal(counts, features['within'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark: load time + memory footprint, CSV (object dtypes) vs Parquet bertipe.
+
+    python -m benchmarks.bench_storage --sizes 2000 1000000 10000000
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import generate_data
+from data_store import columnar_path, load_dataset
+
+
+def _measure(fn):
+    start = time.perf_counter()
+    df = fn()
+    elapsed = time.perf_counter() - start
+    return elapsed, df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'format':>8} {'file MB':>9} {'load s':>8} {'mem MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            csv_path = os.path.join(tmp, f"dummy_{n}.csv")
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_data.generate_indonesia_dataset_fast(n, csv_path, seed=0)
+            parquet_path = columnar_path(csv_path)
+
+            for fmt, path, fn in [
+                ("csv", csv_path, lambda: pd.read_csv(csv_path)),
+                ("parquet", parquet_path, lambda: load_dataset(csv_path)),
+            ]:
+                elapsed, mem = _measure(fn)
+                size = os.path.getsize(path) / 1e6
+                print(f"{n:>12,} {fmt:>8} {size:>9.1f} {elapsed:>8.3f} {mem / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
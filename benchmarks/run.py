@@ -0,0 +1,317 @@
+"""Headless benchmark harness: every pipeline stage at several sizes, JSON results.
+
+    python -m benchmarks.run --sizes 2000 100000 1000000 10000000 --out bench.json
+    python -m benchmarks.run --stages scoring filtering --compare bench_main.json
+    python -m benchmarks.run --sizes 1000000 --profile-dir prof/     # cProfile .prof per stage
+
+Each (stage, size) runs in a fresh subprocess so peak RSS (ru_maxrss) belongs to
+that stage alone. A stage is timed without tracing (best of --repeat), then run
+once more under tracemalloc for the allocation peak. For py-spy, profile a single
+child directly:
+    py-spy record -o scoring.svg -- python -m benchmarks.run --child scoring 1000000 /tmp/fnb_bench
+"""
+import argparse
+import contextlib
+import cProfile
+import datetime
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+DEFAULT_SIZES = [2000, 100_000, 1_000_000]
+STAGES = ['generate', 'regenerate', 'load', 'scoring', 'filtering', 'rendering']
+FIXED_SIZE_STAGES = {'regenerate'}  # the Malaysia generator has a fixed row count
+# Same as main.py's APP_COLUMNS (the app script can't be imported without Streamlit running it)
+LOAD_COLUMNS = ['Location_ID', 'Latitude', 'Longitude', 'Avg_Income', 'Traffic_Daily',
+                'Competitors', 'Rent_Per_Year', 'Grade', 'Verdict']
+
+
+# ---------------------------------------------------------------------------
+# Stages: setup(size, workdir) -> state (untimed), run(state) -> rows processed
+# ---------------------------------------------------------------------------
+
+def _dataset(size, workdir):
+    """Generated Indonesia dataset of `size` rows (CSV + Parquet), created once per workdir."""
+    import generate_data
+
+    path = os.path.join(workdir, str(size), 'dummy.csv')
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_data.generate_indonesia_dataset_fast(size, path, seed=0)
+    return path
+
+
+def _scored_frame(size, workdir):
+    from data_store import load_dataset
+    from norm_stats import NormStats
+    from scoring import INDONESIA_DEFAULT_WEIGHTS, INDONESIA_FEATURES, INDONESIA_SIGNS, INDONESIA_WEIGHT_KEYS
+    from scoring import stable_score, weight_vector
+
+    df = load_dataset(_dataset(size, workdir))
+    X = NormStats.from_frame(df, INDONESIA_FEATURES).normalize(df)
+    df['AI_Score'] = stable_score(X, weight_vector(INDONESIA_DEFAULT_WEIGHTS, INDONESIA_WEIGHT_KEYS, INDONESIA_SIGNS))
+    return df
+
+
+def setup_generate(size, workdir):
+    return size, os.path.join(workdir, 'generate', 'dummy.csv')
+
+
+def run_generate(state):
+    import generate_data
+
+    size, path = state
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_data.generate_indonesia_dataset_fast(size, path, seed=0)
+    return size
+
+
+def setup_regenerate(size, workdir):
+    return os.path.join(workdir, 'regenerate', 'malaysia_fnb_branches_2000.csv')
+
+
+def run_regenerate(path):
+    import pandas as pd
+    import regenerate_dataset
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        regenerate_dataset.generate_malaysia_dataset(path)
+    return len(pd.read_csv(path, usecols=['branch_id']))
+
+
+def setup_load(size, workdir):
+    return _dataset(size, workdir)
+
+
+def run_load(path):
+    """main.py's cold start: build the memory-mapped Arrow copy from Parquet/CSV, open it, take app columns."""
+    from data_store import mapped_path, open_mapped
+
+    if os.path.exists(mapped_path(path)):
+        os.remove(mapped_path(path))
+    return len(open_mapped(path).frame(LOAD_COLUMNS))
+
+
+def setup_scoring(size, workdir):
+    from data_store import load_dataset
+
+    return load_dataset(_dataset(size, workdir))
+
+
+def run_scoring(df):
+    """Stats + normalized matrix once, then one re-score per weight change (10 slider moves)."""
+    from norm_stats import NormStats
+    from scoring import INDONESIA_DEFAULT_WEIGHTS, INDONESIA_FEATURES, INDONESIA_SIGNS, INDONESIA_WEIGHT_KEYS
+    from scoring import stable_score, weight_vector
+
+    X = NormStats.from_frame(df, INDONESIA_FEATURES).normalize(df)
+    for step in range(10):
+        weights = {**INDONESIA_DEFAULT_WEIGHTS, 'traffic': step / 10}
+        stable_score(X, weight_vector(weights, INDONESIA_WEIGHT_KEYS, INDONESIA_SIGNS))
+    return len(df)
+
+
+def setup_filtering(size, workdir):
+    from filter_index import CategoryIndex, ScoreIndex
+
+    df = _scored_frame(size, workdir)
+    return df, CategoryIndex(df['City']), ScoreIndex(df['AI_Score'].to_numpy())
+
+
+def run_filtering(state):
+    """Ten filter changes against the precomputed indexes, as the sidebar does."""
+    from filter_index import intersect_positions
+
+    df, city_index, score_index = state
+    cities = city_index.options
+    for step in range(10):
+        selected = cities[step % len(cities):step % len(cities) + 5]
+        positions = intersect_positions(len(df), [city_index.positions(selected),
+                                                  score_index.positions(step * 5, 100)])
+        df.take(positions)
+    return len(df)
+
+
+def setup_rendering(size, workdir):
+    return _scored_frame(size, workdir)
+
+
+def run_rendering(df):
+    """main.py's map: marker layers up to GRID_MAP_THRESHOLD, viewport grid cells above, rendered to HTML."""
+    import folium
+
+    from map_layers import GRID_MAP_THRESHOLD, add_grid_layer, add_location_layer
+    from spatial_grid import GridPyramid, bbox_of
+
+    if len(df) > GRID_MAP_THRESHOLD:
+        bbox = bbox_of(df['Latitude'], df['Longitude'])
+        m = folium.Map(location=[(bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2], zoom_start=5)
+        add_grid_layer(m, GridPyramid(df['Latitude'].to_numpy(), df['Longitude'].to_numpy()), df, bbox, 5)
+    else:
+        m = folium.Map(location=[df['Latitude'].mean(), df['Longitude'].mean()], zoom_start=12)
+        add_location_layer(m, df)
+    m.get_root().render()
+    return len(df)
+
+
+# ---------------------------------------------------------------------------
+# Child: one stage at one size, prints a JSON record
+# ---------------------------------------------------------------------------
+
+def _rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_child(stage, size, workdir, repeat, trace, profile_dir):
+    setup, run = globals()[f'setup_{stage}'], globals()[f'run_{stage}']
+    state = setup(size, workdir)
+    rss_start = _rss_mb() if os.path.exists('/proc/self/statm') else None
+
+    times, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = run(state)
+        times.append(time.perf_counter() - start)
+    record = {
+        'stage': stage, 'size': size, 'rows': rows,
+        'wall_s': min(times), 'wall_all_s': times,
+        'rows_per_s': rows / min(times) if min(times) > 0 else None,
+        'rss_start_mb': rss_start, 'peak_rss_mb': _peak_rss_mb(),
+    }
+
+    if trace:
+        tracemalloc.start()
+        run(state)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        record['tracemalloc_peak_mb'] = peak / 2 ** 20
+
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f'{stage}_{size}.prof')
+        profiler = cProfile.Profile()
+        profiler.runcall(run, state)
+        profiler.dump_stats(path)
+        record['profile'] = path
+
+    print(json.dumps(record))
+
+
+# ---------------------------------------------------------------------------
+# Parent: fan out children, collect, compare
+# ---------------------------------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_suite(stages, sizes, workdir, repeat=3, trace=True, profile_dir=None, log=print):
+    results = []
+    for stage in stages:
+        for size in sizes[:1] if stage in FIXED_SIZE_STAGES else sizes:
+            cmd = [sys.executable, '-m', 'benchmarks.run', '--child', stage, str(size), workdir,
+                   '--repeat', str(repeat)]
+            if not trace:
+                cmd.append('--no-tracemalloc')
+            if profile_dir:
+                cmd += ['--profile-dir', profile_dir]
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            if proc.returncode != 0:
+                # A killed child (e.g. OOM SIGKILL) leaves no traceback; report its exit code instead
+                error = proc.stderr.strip() or f"exited with code {proc.returncode}"
+                log(f"❌ {stage} @ {size:,}: {error.splitlines()[-1]}")
+                results.append({'stage': stage, 'size': size, 'returncode': proc.returncode, 'error': error[-2000:]})
+                continue
+            record = json.loads(proc.stdout.strip().splitlines()[-1])
+            results.append(record)
+            log(_format(record))
+    return results
+
+
+def _format(record, baseline=None):
+    alloc = record.get('tracemalloc_peak_mb')
+    line = (f"{record['stage']:>10} {record['rows']:>12,} {record['wall_s']:>9.3f} "
+            f"{record['peak_rss_mb']:>9.1f} {'-' if alloc is None else f'{alloc:.1f}':>9}")
+    if baseline:
+        line += f" {record['wall_s'] / baseline['wall_s']:>7.2f}x"
+    return line
+
+
+def compare(results, baseline_path, log=print):
+    """Print wall-time ratios against a previous results file (>1 means slower now)."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    old = {(r['stage'], r['size']): r for r in baseline['results'] if 'error' not in r}
+    log(f"\nvs {baseline_path} (commit {baseline['meta'].get('commit')})")
+    log(f"{'stage':>10} {'rows':>12} {'wall s':>9} {'rss MB':>9} {'alloc MB':>9} {'ratio':>8}")
+    for record in results:
+        if 'error' not in record and (record['stage'], record['size']) in old:
+            log(_format(record, old[(record['stage'], record['size'])]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every pipeline stage headlessly')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'fnb_bench'),
+                        help='Generated datasets are cached here between runs')
+    parser.add_argument('--out', default=None, help='Write JSON results here')
+    parser.add_argument('--compare', default=None, help='Previous JSON results to compare against')
+    parser.add_argument('--no-tracemalloc', dest='trace', action='store_false')
+    parser.add_argument('--profile-dir', default=None, help='Dump a cProfile .prof per stage and size')
+    parser.add_argument('--child', nargs=3, metavar=('STAGE', 'SIZE', 'WORKDIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        stage, size, workdir = args.child
+        run_child(stage, int(size), workdir, args.repeat, args.trace, args.profile_dir)
+        return
+
+    print(f"{'stage':>10} {'rows':>12} {'wall s':>9} {'rss MB':>9} {'alloc MB':>9}")
+    results = run_suite(args.stages, args.sizes, args.workdir, args.repeat, args.trace, args.profile_dir)
+    report = {'meta': metadata(), 'sizes': args.sizes, 'results': results}
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results saved: {os.path.abspath(args.out)}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+
+# Explicit on-disk dtypes per dataset. Label columns are categoricals, metric
+# columns are downcast to the smallest type that fits the generator ranges.
+# Coordinates stay float64: float32 only keeps ~1 m precision at these
+# longitudes, which the spatial features need.
+INDONESIA_SCHEMA = {
+    'Location_ID': 'str',
+    'City': 'category',
+    'Province': 'category',
+    'Address': 'str',
+    'Latitude': 'float64',
+    'Longitude': 'float64',
+    'Avg_Income': 'int32',
+    'Traffic_Daily': 'int32',
+    'Competitors': 'int16',
+    'Rent_Per_Year': 'int32',
+    'AI_Score': 'int8',
+    'Grade': 'category',
+    'Verdict': 'category',
+    # Spatial competitor features (spatial_index.py)
+    'Branches_Within_1km': 'int32',
+    'Nearest_Branch_Km': 'float32',
+    'Knn5_Mean_Km': 'float32',
+    'Cannibalization_Score': 'float32',
+}
+
+MALAYSIA_SCHEMA = {
+    'branch_id': 'str',
+    'country': 'category',
+    'state': 'category',
+    'city': 'category',
+    'latitude': 'float64',
+    'longitude': 'float64',
+    'population_density': 'int32',
+    'median_income_myr': 'int32',
+    'competitor_count': 'int16',
+    'mall_density_index': 'float32',
+    'office_density_index': 'float32',
+    'tourism_score': 'float32',
+    'halal_certified_area': 'bool',
+    'location_score': 'float32',
+    # Spatial competitor features (spatial_index.py)
+    'branches_within_1km': 'int32',
+    'nearest_branch_km': 'float32',
+    'knn5_mean_km': 'float32',
+    'cannibalization_score': 'float32',
+}
+
+DATASET_SCHEMAS = {
+    'indonesia': INDONESIA_SCHEMA,
+    'malaysia': MALAYSIA_SCHEMA,
+}
+
+# Default file name of each dataset, so tools can tell the dataset of a known path
+DATASET_FILES = {
+    'dummy.csv': 'indonesia',
+    'malaysia_fnb_branches_2000.csv': 'malaysia',
+}
+
+SCHEMAS = {name: DATASET_SCHEMAS[dataset] for name, dataset in DATASET_FILES.items()}
+
+COLUMNAR_EXT = '.parquet'
+MAPPED_EXT = '.arrow'
+
+
+def schema_for(csv_path):
+    return SCHEMAS.get(os.path.basename(csv_path))
+
+
+def dataset_for(csv_path):
+    """'indonesia' / 'malaysia' for a dataset's default file name; other names need the caller to say."""
+    try:
+        return DATASET_FILES[os.path.basename(csv_path)]
+    except KeyError:
+        raise ValueError(f"{csv_path}: unknown dataset file, pass the dataset explicitly "
+                         f"({' / '.join(DATASET_SCHEMAS)})") from None
+
+
+def columnar_path(csv_path):
+    """dummy.csv -> dummy.parquet (stored next to the CSV)."""
+    return os.path.splitext(csv_path)[0] + COLUMNAR_EXT
+
+
+def apply_schema(df, schema):
+    """Cast the columns present in `df` to the schema dtypes."""
+    if not schema:
+        return df
+    return df.astype({col: dtype for col, dtype in schema.items() if col in df.columns})
+
+
+def save_columnar(df, csv_path, schema=None):
+    """Write the typed Parquet copy of a dataset next to its CSV."""
+    schema = schema or schema_for(csv_path)
+    path = columnar_path(csv_path)
+    apply_schema(df, schema).to_parquet(path, index=False)
+    return path
+
+
+def _is_fresh(columnar, csv_path):
+    if not os.path.exists(columnar):
+        return False
+    # A CSV regenerated after the Parquet copy wins, otherwise we'd serve stale data
+    return not os.path.exists(csv_path) or os.path.getmtime(columnar) >= os.path.getmtime(csv_path)
+
+
+def load_dataset(csv_path, columns=None, schema=None):
+    """Load a dataset, preferring the columnar copy and falling back to the CSV."""
+    schema = schema or schema_for(csv_path)
+    columnar = columnar_path(csv_path)
+    if _is_fresh(columnar, csv_path):
+        return pd.read_parquet(columnar, columns=columns)
+
+    dtype = None
+    if schema:
+        # bool can't be parsed directly from 0/1 text, cast after reading
+        dtype = {col: t for col, t in schema.items() if t != 'bool'}
+    df = pd.read_csv(csv_path, usecols=columns, dtype=dtype)
+    return apply_schema(df, schema)
+
+
+def temp_path(path):
+    """Fresh temp file next to `path` for write-then-rename; unique per call, so concurrent
+    writers (threads or processes) never share one."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    os.close(fd)
+    os.chmod(tmp, 0o644)  # mkstemp creates 0600; keep the result readable like a plain write
+    return tmp
+
+
+def mapped_path(csv_path):
+    """dummy.csv -> dummy.arrow (uncompressed Arrow IPC, memory-mappable)."""
+    return os.path.splitext(csv_path)[0] + MAPPED_EXT
+
+
+def save_mapped(df, csv_path, schema=None):
+    """Write the Arrow IPC copy as a single record batch so columns map zero-copy."""
+    schema = schema or schema_for(csv_path)
+    path = mapped_path(csv_path)
+    table = pa.Table.from_pandas(apply_schema(df, schema), preserve_index=False).combine_chunks()
+    # Write to a temp file and rename: several replicas may race to build it
+    tmp = temp_path(path)
+    try:
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(len(table), 1))
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
+
+
+def _column_to_pandas(column):
+    if column.num_chunks != 1:
+        return column.to_pandas()
+    chunk = column.chunk(0)
+    if pa.types.is_dictionary(chunk.type):
+        return pd.Categorical.from_codes(chunk.indices.to_numpy(zero_copy_only=False),
+                                         chunk.dictionary.to_pandas())
+    if chunk.null_count == 0 and (pa.types.is_integer(chunk.type) or pa.types.is_floating(chunk.type)):
+        # Read-only view into the mapped file; pandas copy-on-write copies only if mutated
+        return chunk.to_numpy(zero_copy_only=True)
+    return column.to_pandas()
+
+
+class MappedDataset:
+    """Memory-mapped Arrow IPC dataset. Pages live in the OS page cache and are
+    shared by every process mapping the same file; `frame()` materializes only
+    the requested columns.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+    def __len__(self):
+        return self._table.num_rows
+
+    @property
+    def columns(self):
+        return self._table.column_names
+
+    def frame(self, columns=None):
+        """DataFrame of `columns`. Numeric columns are read-only views: adding or
+        replacing columns is fine, in-place edits need `.copy()` first.
+        """
+        columns = self.columns if columns is None else columns
+        data = {col: _column_to_pandas(self._table.column(col)) for col in columns}
+        # copy=False keeps the numeric columns as views into the mapping
+        return pd.DataFrame(data, copy=False)
+
+
+def open_mapped(csv_path, schema=None):
+    """Map the dataset's .arrow copy, building it once from Parquet/CSV if missing or stale."""
+    path = mapped_path(csv_path)
+    if not _is_fresh(path, csv_path):
+        save_mapped(load_dataset(csv_path, schema=schema), csv_path, schema)
+    return MappedDataset(path)
+
+
+def dataset_fingerprint(path):
+    """Cheap identity for cache keys: path, size and mtime (no content hashing)."""
+    stat = os.stat(path)
+    return f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'
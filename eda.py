@@ -0,0 +1,414 @@
+"""One-pass, chunked dataset profiling with mergeable sketches.
+
+    python eda.py dummy.csv --workers 4
+
+Every accumulator merges exactly (moments, co-moments, histograms, category
+counts) or within the sketch's error bound (quantiles), so chunks can be
+profiled in parallel and combined. Memory is bounded by the chunk size plus
+O(columns² + columns · (bins + compression)).
+"""
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+DIGEST_COMPRESSION = 1000
+HIST_BINS = 50
+HIST_PAD = 0.1  # range guessed from one chunk is widened by this fraction; the rest lands in under/overflow
+MAX_CATEGORIES = 10_000
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+class Moments:
+    """Per-column count / mean / M2 / min / max, merged with Chan et al.'s parallel update. NaNs skipped."""
+
+    def __init__(self, k):
+        self.count = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+
+    @classmethod
+    def from_array(cls, X):
+        m = cls(X.shape[1])
+        valid = ~np.isnan(X)
+        m.count = valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            m.mean = np.where(m.count > 0, np.nansum(X, axis=0) / m.count, 0.0)
+        m.m2 = np.nansum((X - m.mean) ** 2, axis=0)
+        m.min = np.where(valid, X, np.inf).min(axis=0, initial=np.inf)
+        m.max = np.where(valid, X, -np.inf).max(axis=0, initial=-np.inf)
+        return m
+
+    def merge(self, other):
+        out = Moments(len(self.count))
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out.mean = np.where(n > 0, self.mean + delta * other.count / n, 0.0)
+            out.m2 = self.m2 + other.m2 + np.where(n > 0, delta ** 2 * self.count * other.count / n, 0.0)
+        out.count = n
+        out.min = np.minimum(self.min, other.min)
+        out.max = np.maximum(self.max, other.max)
+        return out
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, same as DataFrame.describe)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+
+class CoMoments:
+    """Count, mean vector and co-moment matrix over rows complete in every column; mergeable."""
+
+    def __init__(self, k):
+        self.count = 0
+        self.mean = np.zeros(k)
+        self.c = np.zeros((k, k))
+
+    @classmethod
+    def from_array(cls, X):
+        m = cls(X.shape[1])
+        X = X[~np.isnan(X).any(axis=1)]
+        m.count = len(X)
+        if m.count:
+            m.mean = X.mean(axis=0)
+            D = X - m.mean
+            m.c = D.T @ D
+        return m
+
+    def merge(self, other):
+        out = CoMoments(len(self.mean))
+        n = self.count + other.count
+        if n == 0:
+            return out
+        delta = other.mean - self.mean
+        out.count = n
+        out.mean = self.mean + delta * other.count / n
+        out.c = self.c + other.c + np.outer(delta, delta) * self.count * other.count / n
+        return out
+
+    def corr(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sd = np.sqrt(np.diag(self.c))
+            return self.c / np.outer(sd, sd)
+
+
+class TDigest:
+    """Merging t-digest: weighted centroids sized by the k1 scale function.
+
+    Compression is vectorized: each (sorted) centroid goes to bucket floor(k(q)) of
+    its cumulative-weight midpoint, so a bucket spans about one unit of k and
+    buckets are small near the tails. Error is O(1/compression) in rank, tighter at
+    the extremes; merging is concatenate + recompress.
+    """
+
+    def __init__(self, compression=DIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def from_values(cls, values, compression=DIGEST_COMPRESSION):
+        d = cls(compression)
+        values = values[~np.isnan(values)]
+        if len(values):
+            d.min, d.max = values.min(), values.max()
+            d._compress(np.sort(values), np.ones(len(values)))
+        return d
+
+    def _compress(self, means, weights):
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        bucket = np.floor(k - k[0]).astype(np.int64)
+        w = np.bincount(bucket, weights=weights)
+        keep = w > 0
+        self.weights = w[keep]
+        self.means = np.bincount(bucket, weights=means * weights)[keep] / self.weights
+
+    def merge(self, other):
+        out = TDigest(self.compression)
+        out.min, out.max = min(self.min, other.min), max(self.max, other.max)
+        means = np.concatenate([self.means, other.means])
+        if len(means):
+            weights = np.concatenate([self.weights, other.weights])
+            order = np.argsort(means, kind='stable')
+            out._compress(means[order], weights[order])
+        return out
+
+    @property
+    def count(self):
+        return self.weights.sum()
+
+    def cdf(self, x):
+        """Approximate fraction of values <= x."""
+        if not len(self.means):
+            return np.full(np.shape(x), np.nan)
+        q = (np.cumsum(self.weights) - self.weights / 2) / self.count
+        return np.interp(x, np.r_[self.min, self.means, self.max], np.r_[0.0, q, 1.0])
+
+    def quantile(self, qs):
+        if not len(self.means):
+            return np.full(np.shape(qs), np.nan)
+        q = (np.cumsum(self.weights) - self.weights / 2) / self.count
+        return np.interp(qs, np.r_[0.0, q, 1.0], np.r_[self.min, self.means, self.max])
+
+
+class Histogram:
+    """Fixed-edge counts plus underflow/overflow; two histograms merge if their edges match."""
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.under = 0
+        self.over = 0
+
+    @classmethod
+    def for_range(cls, lo, hi, bins=HIST_BINS, pad=HIST_PAD):
+        if not np.isfinite(lo) or not np.isfinite(hi):
+            lo, hi = 0.0, 1.0
+        span = hi - lo if hi > lo else max(abs(lo), 1.0)
+        return cls(np.linspace(lo - pad * span, hi + pad * span, bins + 1))
+
+    def update(self, values):
+        values = values[~np.isnan(values)]
+        idx = np.searchsorted(self.edges, values, side='right') - 1
+        idx[values == self.edges[-1]] = len(self.counts) - 1  # right edge is inclusive, as in np.histogram
+        self.under += int((idx < 0).sum())
+        self.over += int((idx >= len(self.counts)).sum())
+        inside = idx[(idx >= 0) & (idx < len(self.counts))]
+        self.counts += np.bincount(inside, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("histograms with different edges can't be merged")
+        out = Histogram(self.edges)
+        out.counts = self.counts + other.counts
+        out.under, out.over = self.under + other.under, self.over + other.over
+        return out
+
+
+class CategoryCounts:
+    """Value counts; past `max_categories` distinct values only the most frequent are kept (approximate)."""
+
+    def __init__(self, max_categories=MAX_CATEGORIES):
+        self.max_categories = max_categories
+        self.counts = Counter()
+        self.missing = 0
+        self.truncated = False
+
+    def update(self, values):
+        counts = pd.Series(values).value_counts(dropna=True)
+        self.missing += int(len(values) - counts.sum())
+        self.counts.update(dict(zip(counts.index.tolist(), counts.to_numpy().tolist())))
+        self._prune()
+        return self
+
+    def merge(self, other):
+        out = CategoryCounts(self.max_categories)
+        out.counts = self.counts + other.counts
+        out.missing = self.missing + other.missing
+        out.truncated = self.truncated or other.truncated
+        out._prune()
+        return out
+
+    def _prune(self):
+        if len(self.counts) > self.max_categories:
+            self.counts = Counter(dict(self.counts.most_common(self.max_categories)))
+            self.truncated = True
+
+    def top(self, n=20):
+        return pd.Series(dict(self.counts.most_common(n)), dtype=np.int64)
+
+
+def split_columns(df):
+    """(numeric, categorical) column names; bools count as categorical."""
+    numeric = [c for c in df.columns
+               if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    return numeric, [c for c in df.columns if c not in numeric]
+
+
+class Profile:
+    """All sketches for one set of columns. `update` with chunks, `merge` partial profiles."""
+
+    def __init__(self, numeric, categorical, edges, compression=DIGEST_COMPRESSION, max_categories=MAX_CATEGORIES):
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.compression = compression
+        self.max_categories = max_categories
+        self.rows = 0
+        self.moments = Moments(len(self.numeric))
+        self.comoments = CoMoments(len(self.numeric))
+        self.digests = {c: TDigest(compression) for c in self.numeric}
+        self.histograms = {c: Histogram(edges[c]) for c in self.numeric}
+        self.categories = {c: CategoryCounts(max_categories) for c in self.categorical}
+
+    @classmethod
+    def for_frame(cls, df, bins=HIST_BINS, ranges=None, **kwargs):
+        """Empty profile whose columns come from a first chunk.
+
+        Histogram edges span `ranges` ({column: (min, max)} over all rows) when given;
+        otherwise they are guessed from this chunk, padded by HIST_PAD.
+        """
+        numeric, categorical = split_columns(df)
+        edges = {}
+        for c in numeric:
+            if ranges is not None:
+                edges[c] = Histogram.for_range(*ranges[c], bins, pad=0.0).edges
+                continue
+            values = df[c].to_numpy(dtype=np.float64)
+            edges[c] = Histogram.for_range(np.nanmin(values, initial=np.inf), np.nanmax(values, initial=-np.inf),
+                                           bins).edges
+        return cls(numeric, categorical, edges, **kwargs)
+
+    def spawn(self):
+        """Empty profile with the same columns and histogram edges (for a parallel chunk)."""
+        return Profile(self.numeric, self.categorical, {c: h.edges for c, h in self.histograms.items()},
+                       self.compression, self.max_categories)
+
+    def update(self, df):
+        X = np.column_stack([df[c].to_numpy(dtype=np.float64) for c in self.numeric]) if self.numeric \
+            else np.empty((len(df), 0))
+        self.rows += len(df)
+        self.moments = self.moments.merge(Moments.from_array(X))
+        self.comoments = self.comoments.merge(CoMoments.from_array(X))
+        for j, c in enumerate(self.numeric):
+            self.digests[c] = self.digests[c].merge(TDigest.from_values(X[:, j], self.digests[c].compression))
+            self.histograms[c].update(X[:, j])
+        for c in self.categorical:
+            self.categories[c].update(df[c].to_numpy())
+        return self
+
+    def merge(self, other):
+        out = self.spawn()
+        out.rows = self.rows + other.rows
+        out.moments = self.moments.merge(other.moments)
+        out.comoments = self.comoments.merge(other.comoments)
+        out.digests = {c: self.digests[c].merge(other.digests[c]) for c in self.numeric}
+        out.histograms = {c: self.histograms[c].merge(other.histograms[c]) for c in self.numeric}
+        out.categories = {c: self.categories[c].merge(other.categories[c]) for c in self.categorical}
+        return out
+
+    def describe(self, quantiles=QUANTILES):
+        """Same rows as DataFrame.describe() for the numeric columns (quantiles approximate)."""
+        m = self.moments
+        out = {'count': m.count, 'mean': m.mean, 'std': m.std, 'min': m.min}
+        for q in quantiles:
+            out[f'{q:.0%}'] = [float(self.digests[c].quantile(q)) for c in self.numeric]
+        out['max'] = m.max
+        return pd.DataFrame(out, index=self.numeric).T
+
+    def corr(self):
+        return pd.DataFrame(self.comoments.corr(), index=self.numeric, columns=self.numeric)
+
+    def histogram(self, column):
+        """(edges, counts, under, over) of a numeric column; under/over count values outside the edges."""
+        h = self.histograms[column]
+        return h.edges, h.counts, h.under, h.over
+
+    def density(self, column, points=200):
+        """Smooth density curve from the quantile sketch (replaces a per-row KDE): (x, pdf)."""
+        d = self.digests[column]
+        x = np.linspace(d.min, d.max, points)
+        return x, np.gradient(d.cdf(x), x)
+
+    def top_categories(self, column, n=20):
+        return self.categories[column].top(n)
+
+
+def _profile_chunk(task):
+    chunk, template = task
+    return template.spawn().update(chunk)
+
+
+def _parquet_ranges(path, columns):
+    """{column: (min, max)} from Parquet footer statistics, or None if any row group lacks them."""
+    import pyarrow.parquet as pq
+
+    meta = pq.ParquetFile(path).metadata
+    names = [meta.schema.column(j).name for j in range(meta.num_columns)]
+    ranges = {}
+    for c in columns:
+        j = names.index(c)
+        lo, hi = np.inf, -np.inf
+        for i in range(meta.num_row_groups):
+            stats = meta.row_group(i).column(j).statistics
+            if stats is None or not stats.has_min_max:
+                return None
+            lo, hi = min(lo, float(stats.min)), max(hi, float(stats.max))
+        ranges[c] = (lo, hi)
+    return ranges
+
+
+def column_ranges(path, columns, chunk_rows=None):
+    """{column: (min, max)} of numeric `columns` over the whole file.
+
+    Parquet answers from its footer; otherwise this is a pass reading only `columns`,
+    far cheaper than the profile itself.
+    """
+    from score_batch import CHUNK_ROWS, iter_chunks
+
+    if path.endswith('.parquet'):
+        ranges = _parquet_ranges(path, columns)
+        if ranges is not None:
+            return ranges
+    lo, hi = np.full(len(columns), np.inf), np.full(len(columns), -np.inf)
+    for chunk in iter_chunks(path, chunk_rows or CHUNK_ROWS, columns):
+        X = np.column_stack([chunk[c].to_numpy(dtype=np.float64) for c in columns])
+        lo = np.fmin(lo, np.nanmin(X, axis=0, initial=np.inf))
+        hi = np.fmax(hi, np.nanmax(X, axis=0, initial=-np.inf))
+    return {c: (lo[j], hi[j]) for j, c in enumerate(columns)}
+
+
+def profile_file(path, chunk_rows=None, workers=None, columns=None):
+    """Profile a CSV/Parquet file in chunks; chunks run on `workers` processes and are merged.
+
+    Histogram edges must be fixed up front so every partial profile can merge; they span
+    each column's full range (column_ranges), so sorted or partitioned input bins correctly.
+    """
+    from score_batch import CHUNK_ROWS, iter_chunks, ordered_map
+
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    chunks = iter_chunks(path, chunk_rows, columns)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError(f"{path} has no rows")
+    numeric, _ = split_columns(first)
+    profile = Profile.for_frame(first, ranges=column_ranges(path, numeric, chunk_rows) if numeric else {})
+    tasks = ((chunk, profile) for chunk in _prepend(first, chunks))
+    for partial in ordered_map(_profile_chunk, tasks, workers):
+        profile = profile.merge(partial)
+    return profile
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='One-pass streaming profile of a dataset')
+    parser.add_argument('path')
+    parser.add_argument('--chunk-rows', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    profile = profile_file(args.path, args.chunk_rows, args.workers)
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(profile.describe().round(3))
+        print()
+        print(profile.corr().round(2))
+        for c in profile.categorical:
+            counts = profile.categories[c]
+            print(f"\n{c}: {len(counts.counts):,}{'+' if counts.truncated else ''} distinct, top 5:")
+            print(counts.top(5).to_string())
+    print(f"\n✅ {profile.rows:,} rows profiled in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,99 @@
+"""Chunked, cached file exports of a filtered result (CSV, gzipped CSV or Parquet).
+
+Rows are written in slices through Arrow writers to a temp file, so the export
+never exists as one Python string. Files are keyed by the caller's state
+fingerprint (dataset, weights, filters) and reused until evicted.
+"""
+import glob
+import gzip
+import hashlib
+import os
+import tempfile
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from data_store import temp_path
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'fnb_exports')
+CHUNK_ROWS = 100_000
+GZIP_LEVEL = 1  # ~10x faster than level 9 for ~8% larger files
+MAX_EXPORTS = 32
+
+# format -> (file extension, mime type)
+EXPORT_FORMATS = {
+    'csv': ('.csv', 'text/csv'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def export_key(*state):
+    """Short stable hash of whatever identifies the exported rows (reprs must be deterministic)."""
+    return hashlib.sha1(repr(state).encode('utf-8')).hexdigest()[:20]
+
+
+def export_path(key, fmt, export_dir=EXPORT_DIR):
+    return os.path.join(export_dir, key + EXPORT_FORMATS[fmt][0])
+
+
+def _open_writer(path, fmt, schema):
+    if fmt == 'parquet':
+        return pq.ParquetWriter(path, schema, compression='zstd'), None
+    sink = gzip.open(path, 'wb', compresslevel=GZIP_LEVEL) if fmt == 'csv.gz' else pa.OSFile(path, 'wb')
+    return pa_csv.CSVWriter(sink, schema), sink
+
+
+def write_export(df, path, fmt='csv', chunk_rows=CHUNK_ROWS):
+    """Write `df` to `path` slice by slice; only one slice is converted to Arrow at a time."""
+    # Unique temp name: sessions are threads of one process and may export the same key at once
+    tmp = temp_path(path)
+    writer = sink = schema = None
+    try:
+        try:
+            for start in range(0, max(len(df), 1), chunk_rows):
+                table = pa.Table.from_pandas(df.iloc[start:start + chunk_rows], preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer, sink = _open_writer(tmp, fmt, schema)
+                writer.write_table(table.cast(schema))
+        finally:
+            if writer is not None:
+                writer.close()
+            if sink is not None:
+                sink.close()
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
+
+
+def _evict(export_dir, keep):
+    """Drop the least recently used exports beyond `keep` (files still being written are left alone)."""
+    files = [p for p in glob.glob(os.path.join(export_dir, '*')) if not p.endswith('.tmp')]
+    files = sorted(files, key=os.path.getatime, reverse=True)
+    for path in files[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def export_file(df, fmt, key, chunk_rows=CHUNK_ROWS, export_dir=EXPORT_DIR):
+    """Path of the export for `key`, writing it only if it isn't on disk already."""
+    path = export_path(key, fmt, export_dir)
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+    os.makedirs(export_dir, exist_ok=True)
+    write_export(df, path, fmt, chunk_rows)
+    _evict(export_dir, MAX_EXPORTS)
+    return path
+
+
+def export_bytes(df, fmt, key, chunk_rows=CHUNK_ROWS, export_dir=EXPORT_DIR):
+    """Contents of the export for `key` (see export_file), read with the file closed afterwards."""
+    with open(export_file(df, fmt, key, chunk_rows, export_dir), 'rb') as f:
+        return f.read()
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class CategoryIndex:
+    """Sorted row positions per category value, built once per dataset.
+
+    Selecting values concatenates their precomputed position lists, so the cost
+    is O(matches) instead of an O(n) string comparison over the column.
+    """
+
+    def __init__(self, values):
+        codes, categories = _factorize(values)
+        self.categories = list(categories)
+        self._lookup = {value: i for i, value in enumerate(self.categories)}
+        self._order = np.argsort(codes, kind='stable')
+        self._bounds = np.searchsorted(codes[self._order], np.arange(len(self.categories) + 1))
+
+    @property
+    def options(self):
+        """Sorted distinct values (for multiselect options)."""
+        return sorted(self.categories)
+
+    def count(self, value):
+        i = self._lookup.get(value)
+        return 0 if i is None else int(self._bounds[i + 1] - self._bounds[i])
+
+    def positions(self, selected):
+        """Sorted row positions whose value is in `selected`."""
+        parts = [self._order[self._bounds[i]:self._bounds[i + 1]]
+                 for i in (self._lookup.get(v) for v in selected) if i is not None]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+
+class ScoreIndex:
+    """Scores sorted once (per weight setting); range queries are two binary searches."""
+
+    def __init__(self, scores):
+        scores = np.asarray(scores)
+        self._order = np.argsort(scores, kind='stable')
+        self._sorted = scores[self._order]
+
+    def _slice(self, lo, hi, hi_inclusive=True):
+        i0 = np.searchsorted(self._sorted, lo, side='left')
+        i1 = np.searchsorted(self._sorted, hi, side='right' if hi_inclusive else 'left')
+        return i0, max(i0, i1)
+
+    def count(self, lo, hi, hi_inclusive=True):
+        i0, i1 = self._slice(lo, hi, hi_inclusive)
+        return int(i1 - i0)
+
+    def positions(self, lo, hi, hi_inclusive=True):
+        """Unsorted row positions with lo <= score <= hi (or < hi)."""
+        i0, i1 = self._slice(lo, hi, hi_inclusive)
+        return self._order[i0:i1]
+
+    def band_positions(self, bands, lo, hi):
+        """Positions in the union of half-open `bands` [b_lo, b_hi), clipped to [lo, hi]."""
+        parts = []
+        for b_lo, b_hi in bands:
+            upper, inclusive = (hi, True) if hi < b_hi else (b_hi, False)
+            parts.append(self.positions(max(lo, b_lo), upper, inclusive))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+
+def intersect_positions(n, position_sets):
+    """Sorted row positions present in every set (sets may be unsorted, no duplicates)."""
+    sets = sorted(position_sets, key=len)
+    if not sets:
+        return np.arange(n)
+    result = np.sort(sets[0])
+    member = np.zeros(n, dtype=bool)
+    for other in sets[1:]:
+        if len(result) == 0:
+            break
+        member[:] = False
+        member[other] = True
+        result = result[member[result]]
+    return result
+
+
+def positions_to_mask(n, positions):
+    mask = np.zeros(n, dtype=bool)
+    mask[positions] = True
+    return mask
+
+
+def _factorize(values):
+    dtype = getattr(values, 'dtype', None)
+    if getattr(dtype, 'name', None) == 'category':
+        return values.cat.codes.to_numpy(), values.cat.categories.tolist()
+    categories, codes = np.unique(np.asarray(values), return_inverse=True)
+    return codes, categories.tolist()
@@ -0,0 +1,327 @@
+"""Reverse/forward geocoding enrichment with pluggable backends and a SQLite cache.
+
+    python geocoding.py malaysia_fnb_branches_2000.csv                 # offline: fill state/district
+    python geocoding.py dummy.csv --forward --backend nominatim --workers 1
+
+Queries are deduplicated (coordinates rounded to --precision decimals), looked up
+in the on-disk cache, and only the misses are sent to the backend from a thread
+pool under the backend's rate limit. Results, including "not found", are cached
+with a TTL; the least recently used entries are evicted past --max-entries.
+"""
+import argparse
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from data_store import dataset_for
+from spatial_index import to_unit_xyz
+
+CACHE_FILE = 'geocode_cache.sqlite'
+TTL_DAYS = 30
+MAX_ENTRIES = 2_000_000
+PRECISION = 4  # decimals of lat/lon in reverse-geocoding keys (~11 m)
+SQL_BATCH = 900  # below SQLite's default host-parameter limit
+
+# Column names per dataset (the two CSVs use different naming styles)
+GEO_COLUMNS = {
+    'indonesia': {'lat': 'Latitude', 'lon': 'Longitude', 'address': 'Address',
+                  'state': 'Geo_Province', 'district': 'Geo_District',
+                  'geo_lat': 'Geo_Latitude', 'geo_lon': 'Geo_Longitude'},
+    'malaysia': {'lat': 'latitude', 'lon': 'longitude', 'address': None,
+                 'state': 'state', 'district': 'district'},
+}
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+# ---------------------------------------------------------------------------
+# Backends: reverse(lat, lon) / forward(query) -> place dict or None
+# ---------------------------------------------------------------------------
+
+class OfflineGeocoder:
+    """Nearest city centroid from the generators' city tables; no network, for tests and dev."""
+
+    name = 'offline'
+    rate = None
+    batch_size = 2048
+
+    def __init__(self, places=None):
+        self.places = places if places is not None else default_places()
+        self._tree = cKDTree(to_unit_xyz([p['lat'] for p in self.places], [p['lon'] for p in self.places]))
+        self._by_city = {p['city'].lower(): p for p in self.places}
+
+    def reverse_batch(self, coords):
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        _, nearest = self._tree.query(to_unit_xyz(coords[:, 0], coords[:, 1]))
+        return [self._place(self.places[i]) for i in nearest]
+
+    def forward_batch(self, queries):
+        return [self._forward(q) for q in queries]
+
+    def _forward(self, query):
+        # "Jl. Sudirman No. 5, Bandung": try the last comma part, then any known city name in the text
+        text = str(query).lower()
+        place = self._by_city.get(text.rsplit(',', 1)[-1].strip())
+        if place is None:
+            place = next((p for city, p in self._by_city.items() if city in text), None)
+        return None if place is None else self._place(place)
+
+    @staticmethod
+    def _place(p):
+        return {'state': p['state'], 'district': p['city'], 'country': p['country'], 'lat': p['lat'], 'lon': p['lon']}
+
+
+class NominatimGeocoder:
+    """OpenStreetMap Nominatim via geopy; the public server allows 1 request/second."""
+
+    name = 'nominatim'
+    batch_size = 1
+
+    def __init__(self, user_agent='fnb-location-intelligence', rate=1.0, timeout=10, country_codes=None):
+        from geopy.geocoders import Nominatim
+
+        self.rate = rate
+        self._client = Nominatim(user_agent=user_agent, timeout=timeout)
+        self._country_codes = country_codes
+
+    def reverse_batch(self, coords):
+        return [self._place(self._client.reverse((lat, lon), exactly_one=True, addressdetails=True))
+                for lat, lon in coords]
+
+    def forward_batch(self, queries):
+        return [self._place(self._client.geocode(q, exactly_one=True, addressdetails=True,
+                                                 country_codes=self._country_codes))
+                for q in queries]
+
+    @staticmethod
+    def _place(location):
+        if location is None:
+            return None
+        address = location.raw.get('address', {})
+        district = next((address[k] for k in ('city_district', 'county', 'city', 'town', 'suburb') if k in address),
+                        None)
+        return {'state': address.get('state'), 'district': district, 'country': address.get('country'),
+                'lat': location.latitude, 'lon': location.longitude}
+
+
+BACKENDS = {'offline': OfflineGeocoder, 'nominatim': NominatimGeocoder}
+
+
+def default_places():
+    """City centroids with state/province from generate_data.CITIES_DB and regenerate_dataset.cities_data."""
+    from generate_data import CITIES_DB
+    from regenerate_dataset import cities_data
+
+    places = [{'city': c['city'], 'state': c['prov'], 'country': 'Indonesia', 'lat': c['lat'], 'lon': c['lng']}
+              for c in CITIES_DB]
+    places += [{'city': city, 'state': info['state'],
+                'country': 'Brunei' if info['state'] == 'Brunei-Muara' else 'Malaysia',
+                'lat': info['lat'], 'lon': info['lon']}
+               for city, info in cities_data.items()]
+    return places
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+# Many keys share one place (same district), so decoded values are memoized; callers must not mutate them
+_decode = functools.lru_cache(maxsize=65536)(json.loads)
+
+
+class GeocodeCache:
+    """key -> place (JSON, or NULL for "not found") with TTL expiry and LRU eviction.
+
+    Used from the calling thread only; worker threads never touch the connection.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl_days=TTL_DAYS, max_entries=MAX_ENTRIES):
+        self.ttl = ttl_days * 86400.0
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS geocode (key TEXT PRIMARY KEY, value TEXT, '
+                          'created REAL NOT NULL, accessed REAL NOT NULL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS geocode_accessed ON geocode (accessed)')
+
+    def get_many(self, keys):
+        """{key: place} for fresh entries (place may be None = cached miss)."""
+        found, now = {}, time.time()
+        with self.conn:
+            for start in range(0, len(keys), SQL_BATCH):
+                batch = keys[start:start + SQL_BATCH]
+                marks = ','.join('?' * len(batch))
+                rows = self.conn.execute(f"SELECT key, value FROM geocode WHERE key IN ({marks}) AND created >= ?",
+                                         (*batch, now - self.ttl)).fetchall()
+                found.update((k, None if v is None else _decode(v)) for k, v in rows)
+                # Touch for LRU in the same batch (one statement, not one per key)
+                self.conn.execute(f"UPDATE geocode SET accessed = ? WHERE key IN ({marks})", (now, *batch))
+        return found
+
+    def put_many(self, items):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO geocode (key, value, created, accessed) VALUES (?, ?, ?, ?)',
+                ((k, None if v is None else json.dumps(v), now, now) for k, v in items))
+
+    def evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries. Returns rows removed."""
+        with self.conn:
+            removed = self.conn.execute('DELETE FROM geocode WHERE created < ?', (time.time() - self.ttl,)).rowcount
+            excess = self.conn.execute('SELECT COUNT(*) FROM geocode').fetchone()[0] - self.max_entries
+            if excess > 0:
+                removed += self.conn.execute('DELETE FROM geocode WHERE key IN (SELECT key FROM geocode '
+                                             'ORDER BY accessed LIMIT ?)', (excess,)).rowcount
+        return removed
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM geocode').fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def resolve(backend, kind, queries, cache=None, workers=4, log=None):
+    """Places for unique `queries` (coordinate pairs for 'reverse', strings for 'forward'), in order.
+
+    Cache hits are served locally; misses go to the backend in batches of
+    backend.batch_size from a thread pool, each batch waiting on the rate limiter.
+    A batch whose request fails comes back as None (not found) and is not cached.
+    """
+    keys = [f'{backend.name}:{kind}:' + (f'{q[0]!r},{q[1]!r}' if kind == 'reverse' else str(q).strip().lower())
+            for q in queries]
+    found = cache.get_many(keys) if cache is not None else {}
+    missing = [i for i, k in enumerate(keys) if k not in found]
+    if log:
+        log(f"  {kind}: {len(queries):,} unique queries, {len(queries) - len(missing):,} cached, "
+            f"{len(missing):,} to {backend.name}")
+
+    if missing:
+        limiter = RateLimiter(backend.rate)
+        call = backend.reverse_batch if kind == 'reverse' else backend.forward_batch
+        batches = [missing[i:i + backend.batch_size] for i in range(0, len(missing), backend.batch_size)]
+
+        def run(batch):
+            limiter.wait()
+            try:
+                return call([queries[i] for i in batch])
+            except Exception as e:
+                # One failed request (HTTP error, timeout) must not discard the other batches
+                return e
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for batch, places in zip(batches, pool.map(run, batches)):
+                if isinstance(places, Exception):
+                    # Left unresolved and uncached, so the next run retries them
+                    failed += len(batch)
+                    if log:
+                        log(f"  {kind}: batch of {len(batch)} failed ({places!r}), left unresolved")
+                    continue
+                new = [(keys[i], place) for i, place in zip(batch, places)]
+                found.update(new)
+                if cache is not None:
+                    cache.put_many(new)
+        if failed and log:
+            log(f"  {kind}: {failed:,} queries unresolved after backend errors")
+    return [found.get(k) for k in keys]
+
+
+def reverse_geocode(backend, lat, lon, cache=None, workers=4, precision=PRECISION, log=None):
+    """(state, district) object arrays for every row; identical rounded coordinates are resolved once."""
+    coords = np.column_stack([np.round(np.asarray(lat, dtype=np.float64), precision),
+                              np.round(np.asarray(lon, dtype=np.float64), precision)])
+    unique, inverse = np.unique(coords, axis=0, return_inverse=True)
+    places = resolve(backend, 'reverse', [tuple(c) for c in unique.tolist()], cache, workers, log)
+    state = np.array([p and p['state'] for p in places], dtype=object)
+    district = np.array([p and p['district'] for p in places], dtype=object)
+    inverse = inverse.ravel()
+    return state[inverse], district[inverse]
+
+
+def forward_geocode(backend, addresses, cache=None, workers=4, log=None):
+    """(lat, lon) float arrays for every address (NaN where not found)."""
+    codes, unique = pd.factorize(pd.Series(addresses).astype(str).str.strip())
+    places = resolve(backend, 'forward', list(unique), cache, workers, log)
+    lat = np.array([np.nan if p is None else p['lat'] for p in places], dtype=np.float64)
+    lon = np.array([np.nan if p is None else p['lon'] for p in places], dtype=np.float64)
+    return lat[codes], lon[codes]
+
+
+def enrich_frame(df, dataset, backend, cache=None, forward=False, workers=4, precision=PRECISION, log=None):
+    """Add (or fill) the dataset's state/district columns, plus forward-geocoded coordinates if asked."""
+    if dataset not in GEO_COLUMNS:
+        raise ValueError(f"unknown dataset {dataset!r}, expected one of {sorted(GEO_COLUMNS)}")
+    cols = GEO_COLUMNS[dataset]
+    df = df.copy()
+    state, district = reverse_geocode(backend, df[cols['lat']], df[cols['lon']], cache, workers, precision, log)
+    df[cols['state']] = state
+    df[cols['district']] = district
+    if forward:
+        if not cols['address']:
+            raise ValueError(f"{dataset} has no address column to forward-geocode")
+        df[cols['geo_lat']], df[cols['geo_lon']] = forward_geocode(backend, df[cols['address']], cache, workers, log)
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reverse/forward geocode a dataset CSV')
+    parser.add_argument('path')
+    parser.add_argument('--dataset', choices=sorted(GEO_COLUMNS), default=None,
+                        help='Dataset of the file (default: from the file name)')
+    parser.add_argument('--output', default=None, help='Default: <name>_geo.csv next to the input')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='offline')
+    parser.add_argument('--forward', action='store_true', help='Also forward-geocode the address column')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--precision', type=int, default=PRECISION)
+    parser.add_argument('--cache', default=CACHE_FILE)
+    parser.add_argument('--ttl-days', type=float, default=TTL_DAYS)
+    parser.add_argument('--max-entries', type=int, default=MAX_ENTRIES)
+    args = parser.parse_args()
+
+    try:
+        dataset = args.dataset or dataset_for(args.path)
+    except ValueError as e:
+        parser.error(str(e))
+    output = args.output or os.path.splitext(args.path)[0] + '_geo.csv'
+    cache = GeocodeCache(args.cache, args.ttl_days, args.max_entries)
+    start = time.perf_counter()
+    try:
+        df = enrich_frame(pd.read_csv(args.path, float_precision='round_trip'), dataset, BACKENDS[args.backend](),
+                          cache, args.forward, args.workers, args.precision, log=print)
+        evicted = cache.evict()
+    finally:
+        cache.close()
+    df.to_csv(output, index=False)
+    print(f"✅ {len(df):,} rows geocoded -> {output} ({time.perf_counter() - start:.2f}s, "
+          f"{evicted:,} cache entries evicted)")
@@ -0,0 +1,161 @@
+"""Per-rerun timing, cache hit/miss and payload-size metrics for the Streamlit apps.
+
+Off unless FNB_DEBUG_METRICS=1. Disabled, `stage()` hands back a shared no-op
+context manager and track_cache() applies the bare cache decorator, so the apps pay
+one attribute lookup per instrumented block. Enabled, every rerun appends one JSON
+line to FNB_METRICS_LOG (default metrics.jsonl) and the apps show a debug panel.
+
+    with stage('scoring'):
+        ...
+    record_size('map.pydeck_json', lambda: len(deck.to_json()))
+
+    @track_cache(st.cache_resource, max_entries=16)
+    def score_index(...):
+"""
+import contextlib
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+ENABLED = os.environ.get('FNB_DEBUG_METRICS', '') not in ('', '0')
+LOG_FILE = os.environ.get('FNB_METRICS_LOG', 'metrics.jsonl')
+
+_NULL = contextlib.nullcontext()
+_local = threading.local()  # Streamlit runs each session's script in its own thread
+_lock = threading.Lock()
+_process_counters = Counter()
+
+
+class RerunMetrics:
+    """Everything recorded during one script run."""
+
+    def __init__(self, app):
+        self.app = app
+        self.started = time.perf_counter()
+        self.stages = defaultdict(float)
+        self.counters = Counter()
+        self.sizes = {}
+
+    def to_dict(self):
+        return {
+            'ts': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'app': self.app,
+            'total_ms': round((time.perf_counter() - self.started) * 1e3, 3),
+            'stages_ms': {k: round(v * 1e3, 3) for k, v in self.stages.items()},
+            'counters': dict(self.counters),
+            'sizes': self.sizes,
+        }
+
+
+def _current():
+    return getattr(_local, 'metrics', None)
+
+
+def begin_rerun(app):
+    """Start collecting for this script run (call at the top of the app)."""
+    if ENABLED:
+        _local.metrics = RerunMetrics(app)
+
+
+@contextlib.contextmanager
+def _timed_stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current()
+        if metrics is not None:
+            metrics.stages[name] += time.perf_counter() - start
+
+
+def stage(name):
+    """Context manager timing a block under `name` (repeated names add up)."""
+    return _timed_stage(name) if ENABLED else _NULL
+
+
+def count(name, n=1):
+    if ENABLED:
+        with _lock:
+            _process_counters[name] += n
+        metrics = _current()
+        if metrics is not None:
+            metrics.counters[name] += n
+
+
+def record_size(name, size):
+    """Record a payload size in bytes; `size` may be a callable, only evaluated when enabled."""
+    if ENABLED:
+        metrics = _current()
+        if metrics is not None:
+            metrics.sizes[name] = size() if callable(size) else size
+
+
+def track_cache(cache_decorator, **cache_kwargs):
+    """Apply a Streamlit cache decorator and count calls and misses of the cached function.
+
+    The inner wrapper only runs when the cache misses, the outer one on every call,
+    so hits = calls - misses.
+    """
+    def wrap(fn):
+        if not ENABLED:
+            return cache_decorator(**cache_kwargs)(fn) if cache_kwargs else cache_decorator(fn)
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def miss(*args, **kwargs):
+            count(f'cache.{name}.miss')
+            return fn(*args, **kwargs)
+        cached = cache_decorator(**cache_kwargs)(miss) if cache_kwargs else cache_decorator(miss)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            count(f'cache.{name}.calls')
+            return cached(*args, **kwargs)
+        call.clear = cached.clear
+        return call
+    return wrap
+
+
+def cache_stats(counters):
+    """{function: (calls, hits, misses)} from cache.* counters."""
+    stats = {}
+    for key, calls in counters.items():
+        if key.startswith('cache.') and key.endswith('.calls'):
+            name = key[len('cache.'):-len('.calls')]
+            misses = counters.get(f'cache.{name}.miss', 0)
+            stats[name] = (calls, calls - misses, misses)
+    return stats
+
+
+def end_rerun(panel=None):
+    """Finish the run: append the JSON line and, given a container (e.g. st.sidebar), draw the panel."""
+    metrics = _current()
+    if metrics is None:
+        return None
+    _local.metrics = None
+    record = metrics.to_dict()
+    with _lock:
+        with open(LOG_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        process_cache = cache_stats(_process_counters)
+    if panel is not None:
+        render_panel(panel, record, process_cache)
+    return record
+
+
+def render_panel(container, record, process_cache):
+    import pandas as pd
+
+    expander = container.expander(f"🐞 Debug metrics ({record['total_ms']:.0f} ms)", expanded=False)
+    stages = pd.Series(record['stages_ms'], dtype=float).sort_values(ascending=False)
+    expander.dataframe(pd.DataFrame({'ms': stages, '% of rerun': (stages / max(record['total_ms'], 1e-9) * 100).round(1)}))
+    if process_cache:
+        expander.caption('Cache (this process): calls / hits / misses')
+        expander.dataframe(pd.DataFrame(process_cache, index=['calls', 'hits', 'misses']).T)
+    if record['sizes']:
+        expander.caption('Payload sizes (bytes)')
+        expander.json(record['sizes'])
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+
+class LabelScheme:
+    """Threshold table that maps scores to grade / verdict / colour in one vectorized pass.
+
+    `thresholds` are ascending band edges; band i is [thresholds[i-1], thresholds[i]),
+    so a score equal to an edge belongs to the higher band (same as `score >= edge`).
+    Every label list is ordered lowest band first and has len(thresholds) + 1 entries.
+    """
+
+    def __init__(self, thresholds, verdicts, colors, grades=None, rgba=None):
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        n_bands = len(self.thresholds) + 1
+        for name, labels in (('verdicts', verdicts), ('colors', colors), ('grades', grades), ('rgba', rgba)):
+            if labels is not None and len(labels) != n_bands:
+                raise ValueError(f"{name} needs {n_bands} entries, got {len(labels)}")
+        self.verdicts = list(verdicts)
+        self.colors = list(colors)
+        self.grades = list(grades) if grades is not None else None
+        self.rgba = [list(c) for c in rgba] if rgba is not None else None
+
+    def with_thresholds(self, thresholds):
+        """Same labels, different band edges."""
+        return LabelScheme(thresholds, self.verdicts, self.colors, self.grades, self.rgba)
+
+    def codes(self, scores):
+        """Band index per score (0 = lowest band), as int8."""
+        return np.digitize(np.asarray(scores, dtype=np.float64), self.thresholds).astype(np.int8)
+
+    def verdict(self, codes):
+        return pd.Categorical.from_codes(codes, self.verdicts)
+
+    def grade(self, codes):
+        return pd.Categorical.from_codes(codes, self.grades)
+
+    def color(self, codes):
+        return pd.Categorical.from_codes(codes, self.colors)
+
+    def label(self, scores):
+        """Grade/Verdict/Color categoricals for `scores` in one pass."""
+        codes = self.codes(scores)
+        out = {'Verdict': self.verdict(codes), 'Color': self.color(codes)}
+        if self.grades is not None:
+            out['Grade'] = self.grade(codes)
+        return pd.DataFrame(out, index=getattr(scores, 'index', None))
+
+    def bands(self):
+        """{verdict: (lo, hi)} half-open score interval of each band."""
+        edges = np.r_[-np.inf, self.thresholds, np.inf]
+        return {v: (float(edges[i]), float(edges[i + 1])) for i, v in enumerate(self.verdicts)}
+
+
+# dummy.csv / generate_data.py: 85+ A, 70+ B, 55+ C, else D
+INDONESIA_LABELS = LabelScheme(
+    thresholds=[55, 70, 85],
+    grades=['D', 'C', 'B', 'A'],
+    verdicts=['Tidak Disarankan ❌', 'Cukup (Perlu Strategi) ⚠️', 'Potensial ✅', 'Sangat Direkomendasikan ⭐'],
+    colors=['red', 'orange', 'blue', 'green'],
+)
+
+# malaysia.py: 70+ Sangat Cocok, 40+ Cocok, else Tidak Cocok
+MALAYSIA_LABELS = LabelScheme(
+    thresholds=[40, 70],
+    verdicts=['Tidak Cocok', 'Cocok', 'Sangat Cocok'],
+    colors=['red', 'blue', 'green'],
+    rgba=[[255, 0, 0, 200], [0, 0, 255, 200], [0, 255, 0, 200]],
+)
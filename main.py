@@ -2,45 +2,101 @@ import folium
 import pandas as pd
 import numpy as np
 import streamlit as st
-from sklearn.preprocessing import MinMaxScaler
 from streamlit_folium import st_folium
-from folium.plugins import MarkerCluster, HeatMap
+from folium.plugins import HeatMap
+
+from data_store import dataset_fingerprint, open_mapped
+from instrumentation import begin_rerun, end_rerun, record_size, stage, track_cache
+from labels import INDONESIA_LABELS
+from model import feature_array, load_or_train, model_features, predict
+from map_layers import GRID_MAP_THRESHOLD, add_grid_layer, add_location_layer, viewport_from_folium
+from norm_stats import load_or_build
+from scoring import INDONESIA_FEATURES, INDONESIA_SIGNS, INDONESIA_WEIGHT_KEYS, stable_score, weight_vector
+from spatial_grid import GridPyramid, bbox_of
 
 st.set_page_config(page_title="F&B Location Intelligence", layout="wide")
+begin_rerun('main')
+
+
+DATA_FILE = 'dummy.csv'
+
+# Kolom yang dipakai dashboard ini (kolom lain tidak pernah dimuat ke memori)
+# Grade/Verdict tidak dibaca: label dihitung ulang dari skor live setiap rerun
+APP_COLUMNS = ['Location_ID', 'Latitude', 'Longitude', 'Avg_Income', 'Traffic_Daily',
+               'Competitors', 'Rent_Per_Year']
+
+
+@track_cache(st.cache_resource)
+def open_dataset():
+    # Memory-mapped: page cache dibagi antar semua replica di host yang sama
+    return open_mapped(DATA_FILE)
 
 
-@st.cache_data
 def load_data():
-    df = pd.read_csv('dummy.csv')
-    return df
+    return open_dataset().frame(APP_COLUMNS)
+
+
+@track_cache(st.cache_resource)
+def feature_matrix(fingerprint, _df):
+    # Normalisasi pakai statistik tersimpan (dummy.stats.json), sama dengan batch job & dashboard lain
+    return load_or_build(DATA_FILE, INDONESIA_FEATURES, _df).normalize(_df)
+
 
+@track_cache(st.cache_resource)
+def scoring_model():
+    # Booster dimuat sekali per proses, bukan per rerun
+    return load_or_train('indonesia')
 
-df = load_data()
+
+@track_cache(st.cache_resource)
+def model_scores(fingerprint, _df):
+    # Prediksi model tidak bergantung pada slider, cukup sekali per dataset
+    booster = scoring_model()
+    return predict(booster, feature_array(_df, model_features(booster)))
+
+
+@track_cache(st.cache_resource)
+def grid_pyramid(fingerprint, _df):
+    # Index agregasi grid dibangun sekali per dataset (df tidak di-hash)
+    return GridPyramid(_df['Latitude'].to_numpy(), _df['Longitude'].to_numpy())
+
+
+with stage('load'):
+    df = load_data()
+    fingerprint = dataset_fingerprint(open_dataset().path)
 
 # 2. Sidebar - Parameter Bobot
 st.sidebar.header('Konfigurasi Bobot AI')
+score_mode = st.sidebar.radio('Mode Skor', ['Bobot Manual', 'Model XGBoost'], horizontal=True)
 w_traffic = st.sidebar.slider('Bobot Traffic', 0.0, 1.0, 0.5)
 w_income = st.sidebar.slider('Bobot Pendapatan', 0.0, 1.0, 0.5)
 w_rent = st.sidebar.slider('Bobot Biaya Sewa (Negatif)', 0.0, 1.0, 0.5)
 w_comp = st.sidebar.slider("Bobot Kompetisi (Negatif)", 0.0, 1.0, 0.5)
 
-selected_grades = st.sidebar.multiselect("Filter Grade", options=df['Grade'].unique(), default=df['Grade'].unique())
+grade_options = INDONESIA_LABELS.grades[::-1]
+selected_grades = st.sidebar.multiselect("Filter Grade", options=grade_options, default=grade_options)
 
 # 3. Logika Model
-scaler = MinMaxScaler()
-cols_to_scale = ['Avg_Income', 'Traffic_Daily', 'Competitors', 'Rent_Per_Year']
-df_scaled = pd.DataFrame(scaler.fit_transform(df[cols_to_scale]), columns=cols_to_scale)
-
-# Menghitung AI Score (Normalisasi ke 0-100)
-raw_score = (df_scaled['Traffic_Daily'] * w_traffic) + \
-            (df_scaled['Avg_Income'] * w_income) - \
-            (df_scaled['Rent_Per_Year'] * w_rent) - \
-            (df_scaled['Competitors'] * w_comp)
-
-df['AI_Score'] = ((raw_score - raw_score.min()) / (raw_score.max() - raw_score.min()) * 100).round(2)
+weights = {'traffic': w_traffic, 'income': w_income, 'rent': w_rent, 'competitor': w_comp}
+with stage('scoring'):
+    X = feature_matrix(fingerprint, df)
+
+    # Menghitung AI Score (0-100 terhadap rentang bobot, stabil antar dataset) atau prediksi model
+    if score_mode == 'Model XGBoost':
+        df['AI_Score'] = model_scores(fingerprint, df)
+    else:
+        df['AI_Score'] = stable_score(X, weight_vector(weights, INDONESIA_WEIGHT_KEYS, INDONESIA_SIGNS))
+
+with stage('labels'):
+    # Grade & Verdict dari skor live (slider atau model) lewat tabel threshold bersama, bukan dari CSV
+    labels = INDONESIA_LABELS.label(df['AI_Score'])
+    df['Grade'] = labels['Grade']
+    df['Verdict'] = labels['Verdict']
 
 # Filter Data Berdasarkan Sidebar
-filtered_df = df[df['Grade'].isin(selected_grades)]
+with stage('filter'):
+    grade_mask = df['Grade'].isin(selected_grades).to_numpy()
+    filtered_df = df[grade_mask]
 
 # 4. Layout Dashboard
 col1, col2 = st.columns([2, 1])
@@ -48,37 +104,36 @@ col1, col2 = st.columns([2, 1])
 with col1:
     st.subheader('Visualisasi Geospasial')
 
-    # Fokus peta ke rata-rata koordinat data
-    m = folium.Map(location=[filtered_df['Latitude'].mean(), filtered_df['Longitude'].mean()], zoom_start=12)
-
-    # PILIHAN: Marker Cluster untuk 2000 titik agar tidak lag
-    marker_cluster = MarkerCluster().add_to(m)
-
-    for i, row in filtered_df.iterrows():
-        # Warna berdasarkan Verdict
-        if 'Sangat Cocok' in row['Verdict']:
-            color = 'green'
-        elif 'Cocok' in row['Verdict']:
-            color = 'blue'
-        else:
-            color = 'red'
-
-        folium.Marker(
-            location=[row['Latitude'], row['Longitude']],
-            popup=folium.Popup(f"""
-                <b>ID: {row['Location_ID']}</b><br>
-                Score: {row['AI_Score']}<br>
-                Grade: {row['Grade']}<br>
-                Verdict: {row['Verdict']}
-            """, max_width=200),
-            icon=folium.Icon(color=color, icon='home')
-        ).add_to(marker_cluster)
-
-    st_folium(m, width=850, height=600, returned_objects=[])
+    if len(filtered_df) > GRID_MAP_THRESHOLD:
+        # Data besar: hanya sel grid (atau titik mentah saat zoom dekat) untuk viewport saat ini
+        default_bbox = bbox_of(filtered_df['Latitude'], filtered_df['Longitude'])
+        bbox, zoom = viewport_from_folium(st.session_state.get('grid_map'), default_bbox, 5)
+        with stage('map.build'):
+            m = folium.Map(location=[(bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2], zoom_start=zoom)
+            pyramid = grid_pyramid(fingerprint, df)
+            add_grid_layer(m, pyramid, df, bbox, zoom, grade_mask)
+        record_size('map.folium_html', lambda: len(m.get_root().render().encode('utf-8')))
+        with stage('map.render'):
+            st_folium(m, width=850, height=600, returned_objects=['bounds', 'zoom'], key='grid_map')
+    else:
+        with stage('map.build'):
+            # Fokus peta ke rata-rata koordinat data
+            m = folium.Map(location=[filtered_df['Latitude'].mean(), filtered_df['Longitude'].mean()], zoom_start=12)
+
+            # Marker per baris untuk data kecil, payload FastMarkerCluster tunggal di atas FAST_MAP_THRESHOLD
+            add_location_layer(m, filtered_df)
+
+        record_size('map.folium_html', lambda: len(m.get_root().render().encode('utf-8')))
+        with stage('map.render'):
+            st_folium(m, width=850, height=600, returned_objects=[])
 
 with col2:
     st.subheader('Tabel Analisis Lokasi')
     # Tampilkan kolom yang relevan saja
-    display_df = filtered_df[['Location_ID', 'Grade', 'AI_Score', 'Verdict']].sort_values(by='AI_Score',
-                                                                                          ascending=False)
-    st.dataframe(display_df, height=600, hide_index=True)
\ No newline at end of file
+    with stage('table'):
+        display_df = filtered_df[['Location_ID', 'Grade', 'AI_Score', 'Verdict']].sort_values(by='AI_Score',
+                                                                                              ascending=False)
+        st.dataframe(display_df, height=600, hide_index=True)
+
+# Panel debug hanya muncul dengan FNB_DEBUG_METRICS=1
+end_rerun(st.sidebar)
\ No newline at end of file
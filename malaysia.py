@@ -1,44 +1,113 @@
+import os
 import pandas as pd
 import numpy as np
 import streamlit as st
-from sklearn.preprocessing import MinMaxScaler
 import pydeck as pdk
 
+from analytics_cube import AnalyticsCube, CubeBase, density_sample
+from data_store import dataset_fingerprint, open_mapped
+from export import EXPORT_FORMATS, export_bytes, export_key
+from instrumentation import begin_rerun, end_rerun, record_size, stage, track_cache
+from filter_index import CategoryIndex, ScoreIndex, intersect_positions, positions_to_mask
+from labels import MALAYSIA_LABELS
+from model import feature_array, has_signal, load_model, model_features, model_path, predict
+from norm_stats import load_or_build
+from site_selection import select_frame
+from scoring import MALAYSIA_FEATURES, MALAYSIA_SIGNS, MALAYSIA_WEIGHT_KEYS, stable_score, weight_vector
+from spatial_grid import CELL_ZOOM_OFFSET, MAX_RAW_POINTS, GridPyramid
+
 st.set_page_config(
     page_title="F&B Location Intelligence",
     layout="wide",
     initial_sidebar_state="expanded"
 )
+begin_rerun('malaysia')
 
 # ============================================================================
 # DATA LOADING & PROCESSING
 # ============================================================================
 
-@st.cache_data
+DATA_FILE = 'malaysia_fnb_branches_2000.csv'
+
+# Verdict bands on AI_Score, half-open [lo, hi)
+VERDICT_BANDS = MALAYSIA_LABELS.bands()
+
+# Columns this app reads; everything else stays on disk
+APP_COLUMNS = ['branch_id', 'city', 'latitude', 'longitude', 'population_density', 'median_income_myr',
+               'mall_density_index', 'office_density_index', 'tourism_score', 'competitor_count',
+               'halal_certified_area']
+
+@track_cache(st.cache_resource)
+def open_dataset():
+    """Memory-mapped dataset; its pages are shared by every replica on the host"""
+    return open_mapped(DATA_FILE)
+
 def load_data():
-    """Load and prepare dataset"""
-    df = pd.read_csv('malaysia_fnb_branches_2000.csv')
-    return df
-
-@st.cache_data
-def calculate_scores(df, weights):
-    """Calculate AI scores based on weights"""
-    scaler = MinMaxScaler()
-    cols = ['population_density', 'median_income_myr', 'mall_density_index', 
-            'office_density_index', 'tourism_score', 'competitor_count']
-    
-    df_scaled = pd.DataFrame(scaler.fit_transform(df[cols]), columns=cols)
-    
-    raw_score = (
-        df_scaled['population_density'] * weights['population'] +
-        df_scaled['median_income_myr'] * weights['income'] +
-        df_scaled['mall_density_index'] * weights['mall'] +
-        df_scaled['office_density_index'] * weights['office'] +
-        df_scaled['tourism_score'] * weights['tourism'] -
-        df_scaled['competitor_count'] * weights['competitor']
-    )
-    
-    return ((raw_score - raw_score.min()) / (raw_score.max() - raw_score.min()) * 100).round(2)
+    """Materialize only the columns the app uses (numeric ones are views into the map)"""
+    return open_dataset().frame(APP_COLUMNS)
+
+@track_cache(st.cache_resource)
+def feature_matrix(fingerprint, _df):
+    """Feature matrix normalized with the persisted stats artifact, once per dataset (df not hashed)"""
+    return load_or_build(DATA_FILE, MALAYSIA_FEATURES, _df).normalize(_df)
+
+@track_cache(st.cache_resource)
+def grid_pyramid(fingerprint, _df):
+    """Spatial aggregation index over all rows, built once per dataset"""
+    return GridPyramid(_df['latitude'].to_numpy(), _df['longitude'].to_numpy())
+
+@track_cache(st.cache_resource)
+def filter_indexes(fingerprint, _df):
+    """Per-city row positions and halal row positions, built once per dataset"""
+    return CategoryIndex(_df['city']), np.flatnonzero(_df['halal_certified_area'].to_numpy())
+
+@track_cache(st.cache_resource, max_entries=16)
+def score_index(fingerprint, weights_key, _scores):
+    """AI scores sorted once per weight setting, for binary-searched range filters"""
+    return ScoreIndex(_scores)
+
+@track_cache(st.cache_resource)
+def scoring_model():
+    """Saved XGBoost booster, or None without one that has predictive signal (loaded once per process).
+
+    Not trained on demand: location_score is random, so a fresh model would score every branch alike.
+    """
+    path = model_path('malaysia')
+    if not os.path.exists(path):
+        return None
+    booster = load_model(path)
+    return booster if has_signal(booster) else None
+
+@track_cache(st.cache_resource)
+def model_scores(fingerprint, _df):
+    """Model predictions don't depend on the sliders, so they are computed once per dataset"""
+    booster = scoring_model()
+    return predict(booster, feature_array(_df, model_features(booster)))
+
+@track_cache(st.cache_resource)
+def cube_base(fingerprint, _df):
+    """Weight-independent city x halal key of the analytics cube, built once per dataset"""
+    return CubeBase(_df['city'], _df['halal_certified_area'])
+
+@track_cache(st.cache_resource, max_entries=16)
+def analytics_cube(fingerprint, scores_key, _df):
+    """Analytics cube for one weight setting; only score bins and verdicts are recomputed"""
+    return AnalyticsCube(cube_base(fingerprint, _df), _df['AI_Score'].to_numpy(), _df['Verdict'].cat.codes.to_numpy(),
+                         MALAYSIA_LABELS.verdicts, {'income': _df['median_income_myr'].to_numpy()})
+
+@track_cache(st.cache_resource, max_entries=8)
+def table_view(fingerprint, scores_key, filters_key, _filtered_df):
+    """Sorted, renamed table for one (dataset, weights, filters) state"""
+    display_df = _filtered_df[[
+        'branch_id', 'city', 'median_income_myr', 'competitor_count',
+        'tourism_score', 'halal_certified_area', 'AI_Score', 'Verdict'
+    ]].sort_values('AI_Score', ascending=False).reset_index(drop=True)
+    display_df.columns = ['Branch', 'City', 'Income (RM)', 'Competitors', 'Tourism', 'Halal', 'Score', 'Verdict']
+    return display_df
+
+def calculate_scores(X, weights):
+    """Calculate AI scores based on weights (single mat-vec against fixed stats, no refit)"""
+    return stable_score(X, weight_vector(weights, MALAYSIA_WEIGHT_KEYS, MALAYSIA_SIGNS))
 
 # ============================================================================
 # SIDEBAR CONFIGURATION
@@ -47,6 +116,12 @@ def calculate_scores(df, weights):
 with st.sidebar:
     st.header("⚙️ Configuration")
     
+    if scoring_model() is not None:
+        score_mode = st.radio("Scoring Mode", ["Weighted", "XGBoost Model"], horizontal=True)
+    else:
+        score_mode = "Weighted"
+        st.caption("XGBoost mode unavailable: no Malaysia model with predictive signal (location_score is random).")
+
     with st.expander("📊 Model Weights", expanded=True):
         weights = {
             'population': st.slider('Population Density', 0.0, 1.0, 0.3, step=0.05),
@@ -61,23 +136,35 @@ with st.sidebar:
     st.header("🔍 Filters")
     
     # Load and process data
-    df = load_data()
-    df['AI_Score'] = calculate_scores(df, weights)
-    df['Verdict'] = df['AI_Score'].apply(
-        lambda x: 'Sangat Cocok' if x >= 70 else ('Cocok' if x >= 40 else 'Tidak Cocok')
-    )
+    with stage('load'):
+        df = load_data()
+        fingerprint = dataset_fingerprint(open_dataset().path)
+    with stage('scoring'):
+        X = feature_matrix(fingerprint, df)
+        if score_mode == "XGBoost Model":
+            df['AI_Score'] = model_scores(fingerprint, df)
+            scores_key = ('model',)
+        else:
+            df['AI_Score'] = calculate_scores(X, weights)
+            scores_key = tuple(weights.items())
+    with stage('verdicts'):
+        df['Verdict'] = MALAYSIA_LABELS.verdict(MALAYSIA_LABELS.codes(df['AI_Score']))
+    with stage('filter_indexes'):
+        city_index, halal_positions = filter_indexes(fingerprint, df)
+        scores = score_index(fingerprint, scores_key, df['AI_Score'].to_numpy())
     
     # Filter controls
+    verdict_options = sorted(v for v, band in VERDICT_BANDS.items() if scores.count(*band, hi_inclusive=False))
     verdict_filter = st.multiselect(
         "Verdict",
-        options=sorted(df['Verdict'].unique()),
-        default=sorted(df['Verdict'].unique())
+        options=verdict_options,
+        default=verdict_options
     )
     
     city_filter = st.multiselect(
         "Cities",
-        options=sorted(df['city'].unique()),
-        default=sorted(df['city'].unique())[:5]
+        options=city_index.options,
+        default=city_index.options[:5]
     )
     
     score_min, score_max = st.slider("AI Score Range", 0.0, 100.0, (0.0, 100.0), step=5.0)
@@ -88,15 +175,20 @@ with st.sidebar:
 # APPLY FILTERS
 # ============================================================================
 
-filtered_df = df[
-    (df['Verdict'].isin(verdict_filter)) &
-    (df['city'].isin(city_filter)) &
-    (df['AI_Score'] >= score_min) &
-    (df['AI_Score'] <= score_max)
-]
+# Intersection of precomputed position sets; verdict + score range are slices of the sorted scores
+with stage('filter'):
+    position_sets = [
+        scores.band_positions([VERDICT_BANDS[v] for v in verdict_filter], score_min, score_max),
+        city_index.positions(city_filter),
+    ]
 
-if halal_only:
-    filtered_df = filtered_df[filtered_df['halal_certified_area'] == 1]
+    if halal_only:
+        position_sets.append(halal_positions)
+
+    positions = intersect_positions(len(df), position_sets)
+    filters_key = (tuple(verdict_filter), tuple(city_filter), score_min, score_max, halal_only)
+    mask = positions_to_mask(len(df), positions)
+    filtered_df = df.take(positions)
 
 # ============================================================================
 # MAIN CONTENT
@@ -117,97 +209,148 @@ else:
     
     st.divider()
     
-    # Tabs for different views
-    tab1, tab2, tab3 = st.tabs(["🗺️ Map", "📊 Table", "📈 Analytics"])
+    # Tabs for different views; only the open tab's body runs on a rerun
+    tab1, tab2, tab3, tab4 = st.tabs(["🗺️ Map", "📊 Table", "📈 Analytics", "🎯 Site Selection"],
+                                     key='view', on_change='rerun')
     
     # ========================================================================
     # MAP VIEW
     # ========================================================================
-    with tab1:
-        map_data = filtered_df.copy()
-        
-        color_map = {
-            'Sangat Cocok': [0, 255, 0, 200],
-            'Cocok': [0, 0, 255, 200],
-            'Tidak Cocok': [255, 0, 0, 200]
-        }
-        map_data['color'] = map_data['Verdict'].map(color_map)
-        
-        layer = pdk.Layer(
-            'ScatterplotLayer',
-            data=map_data,
-            get_position=['longitude', 'latitude'],
-            get_color='color',
-            get_radius=600,
-            pickable=True,
-        )
-        
-        view_state = pdk.ViewState(
-            latitude=map_data['latitude'].mean(),
-            longitude=map_data['longitude'].mean(),
-            zoom=7,
-            pitch=0,
-        )
-        
-        st.pydeck_chart(pdk.Deck(
-            layers=[layer],
-            initial_view_state=view_state,
-            tooltip={'html': '<b>{branch_id}</b><br>City: {city}<br>Score: {AI_Score:.1f}<br>Verdict: {Verdict}'},
-        ))
+    with tab1, stage('view.map'):
+        if tab1.open:
+            view_state = pdk.ViewState(
+                latitude=filtered_df['latitude'].mean(),
+                longitude=filtered_df['longitude'].mean(),
+                zoom=7,
+                pitch=0,
+            )
+            
+            if len(filtered_df) > MAX_RAW_POINTS:
+                # Too many points to ship: send grid cells aggregated at the view's zoom instead
+                cells = grid_pyramid(fingerprint, df).cells(
+                    view_state.zoom + CELL_ZOOM_OFFSET, df['AI_Score'].to_numpy(), mask
+                )
+                shade = cells['score_mean'].to_numpy() / 100
+                cells['color'] = np.column_stack([
+                    255 * (1 - shade), 200 * shade, np.full(len(shade), 60), np.full(len(shade), 180)
+                ]).astype(int).tolist()
+                cells['radius'] = 600 + 4000 * np.sqrt(cells['count'] / cells['count'].max())
+                map_data = cells
+                get_radius = 'radius'
+                tooltip = {'html': '<b>{count} locations</b><br>Avg score: {score_mean}'}
+            else:
+                map_data = filtered_df[['branch_id', 'city', 'latitude', 'longitude', 'AI_Score', 'Verdict']].copy()
+                
+                # Verdict categories are in band order, so their codes index the colour table
+                map_data['color'] = np.asarray(MALAYSIA_LABELS.rgba)[map_data['Verdict'].cat.codes].tolist()
+                get_radius = 600
+                tooltip = {'html': '<b>{branch_id}</b><br>City: {city}<br>Score: {AI_Score:.1f}<br>Verdict: {Verdict}'}
+            
+            layer = pdk.Layer(
+                'ScatterplotLayer',
+                data=map_data,
+                get_position=['longitude', 'latitude'],
+                get_color='color',
+                get_radius=get_radius,
+                pickable=True,
+            )
+            
+            deck = pdk.Deck(
+                layers=[layer],
+                initial_view_state=view_state,
+                tooltip=tooltip,
+            )
+            record_size('map.pydeck_json', lambda: len(deck.to_json().encode('utf-8')))
+            with stage('map.pydeck'):
+                st.pydeck_chart(deck)
     
     # ========================================================================
     # TABLE VIEW
     # ========================================================================
-    with tab2:
-        display_df = filtered_df[[
-            'branch_id', 'city', 'median_income_myr', 'competitor_count',
-            'tourism_score', 'halal_certified_area', 'AI_Score', 'Verdict'
-        ]].sort_values('AI_Score', ascending=False).reset_index(drop=True)
-        
-        display_df.columns = ['Branch', 'City', 'Income (RM)', 'Competitors', 'Tourism', 'Halal', 'Score', 'Verdict']
-        
-        st.dataframe(display_df, use_container_width=True, height=500)
-        
-        # Download button
-        csv = display_df.to_csv(index=False)
-        st.download_button(
-            label="📥 Download CSV",
-            data=csv,
-            file_name="fnb_locations.csv",
-            mime="text/csv"
-        )
+    with tab2, stage('view.table'):
+        if tab2.open:
+            display_df = table_view(fingerprint, scores_key, filters_key, filtered_df)
+            
+            st.dataframe(display_df, use_container_width=True, height=500)
+            
+            # Download button; the file is written in chunks only when clicked and reused per state
+            export_format = st.radio("Export format", list(EXPORT_FORMATS), horizontal=True)
+            extension, mime = EXPORT_FORMATS[export_format]
+            key = export_key(fingerprint, scores_key, filters_key)
+            st.download_button(
+                label=f"📥 Download {export_format.upper()}",
+                data=lambda: export_bytes(display_df, export_format, key),
+                file_name=f"fnb_locations{extension}",
+                mime=mime
+            )
     
     # ========================================================================
     # ANALYTICS VIEW
     # ========================================================================
-    with tab3:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Verdict Distribution")
-            verdict_data = filtered_df['Verdict'].value_counts()
-            st.bar_chart(verdict_data)
-        
-        with col2:
-            st.subheader("Top 10 Cities")
-            city_data = filtered_df['city'].value_counts().head(10)
-            st.bar_chart(city_data)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Score Distribution")
-            hist_data = pd.cut(filtered_df['AI_Score'], bins=10)
-            hist_counts = hist_data.value_counts().sort_index()
-            hist_df = pd.DataFrame({
-                'Range': range(len(hist_counts)),
-                'Count': hist_counts.values
-            })
-            st.bar_chart(hist_df.set_index('Range'))
-        
-        with col2:
-            st.subheader("Income vs Score")
-            scatter_data = filtered_df[['median_income_myr', 'AI_Score']].rename(
-                columns={'median_income_myr': 'Income', 'AI_Score': 'Score'}
+    with tab3, stage('view.analytics'):
+        if tab3.open:
+            # Everything but the scatter is a slice of the cube: O(cells), not O(rows)
+            cube = analytics_cube(fingerprint, scores_key, df)
+            selection = cube.select(verdict_filter, city_filter, score_min, score_max, halal_only)
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("Verdict Distribution")
+                st.bar_chart(cube.verdict_counts(selection, verdict_filter))
+            
+            with col2:
+                st.subheader("Top 10 Cities")
+                st.bar_chart(cube.city_counts(selection).head(10))
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("Score Distribution")
+                st.bar_chart(cube.score_histogram(selection, score_min))
+            
+            with col2:
+                st.subheader("Income vs Score")
+                # Above MAX_SCATTER_POINTS the scatter shows 2-D density cells sized by count
+                scatter_data = density_sample(filtered_df['median_income_myr'], filtered_df['AI_Score']).rename(
+                    columns={'x': 'Income', 'y': 'Score', 'count': 'Count'}
+                )
+                st.scatter_chart(scatter_data, x='Income', y='Score', size='Count')
+    
+    # ========================================================================
+    # SITE SELECTION VIEW
+    # ========================================================================
+    with tab4, stage('view.sites'):
+        if tab4.open:
+            st.markdown("Best **K** new branches from the filtered locations, spaced apart and capped per city")
+            col1, col2, col3 = st.columns(3)
+            top_k = col1.number_input("Branches (K)", 1, 1000, 20, step=5)
+            min_km = col2.slider("Minimum spacing (km)", 0.0, 20.0, 2.0, step=0.5)
+            per_city = col3.number_input("Max per city", 1, 1000, 5)
+            
+            sites = select_frame(filtered_df, int(top_k), min_km, int(per_city))
+            if len(sites) < top_k:
+                st.info(f"Only {len(sites)} locations satisfy the spacing and per-city limits.")
+            
+            sites['color'] = np.asarray(MALAYSIA_LABELS.rgba)[sites['Verdict'].cat.codes].tolist()
+            st.pydeck_chart(pdk.Deck(
+                layers=[pdk.Layer(
+                    'ScatterplotLayer',
+                    data=sites[['Rank', 'branch_id', 'city', 'latitude', 'longitude', 'AI_Score', 'color']],
+                    get_position=['longitude', 'latitude'],
+                    get_color='color',
+                    get_radius=1500,
+                    pickable=True,
+                )],
+                initial_view_state=pdk.ViewState(
+                    latitude=sites['latitude'].mean(), longitude=sites['longitude'].mean(), zoom=6, pitch=0
+                ),
+                tooltip={'html': '<b>#{Rank} {branch_id}</b><br>City: {city}<br>Score: {AI_Score}'},
+            ))
+            st.dataframe(
+                sites[['Rank', 'branch_id', 'city', 'AI_Score', 'Verdict', 'median_income_myr', 'competitor_count']],
+                use_container_width=True, hide_index=True
             )
-            st.scatter_chart(scatter_data)
+
+# Debug panel, only with FNB_DEBUG_METRICS=1
+end_rerun(st.sidebar)
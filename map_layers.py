@@ -0,0 +1,141 @@
+import json
+
+import folium
+import numpy as np
+from branca.element import MacroElement
+from folium.plugins import FastMarkerCluster, MarkerCluster
+from jinja2 import Template
+
+from labels import INDONESIA_LABELS
+
+# Above this many points the map switches from one folium.Marker per row to a
+# single FastMarkerCluster payload rendered in the browser
+FAST_MAP_THRESHOLD = 500
+# Above this many points the map only receives GridPyramid cells for the viewport
+GRID_MAP_THRESHOLD = 20000
+
+
+def add_marker_layer(m, df, labels=INDONESIA_LABELS):
+    """Original path: one folium.Marker + HTML popup per row inside a MarkerCluster."""
+    marker_cluster = MarkerCluster().add_to(m)
+    colors = labels.codes(df['AI_Score'])
+
+    for color, (i, row) in zip(colors, df.iterrows()):
+        folium.Marker(
+            location=[row['Latitude'], row['Longitude']],
+            popup=folium.Popup(f"""
+                <b>ID: {row['Location_ID']}</b><br>
+                Score: {row['AI_Score']}<br>
+                Grade: {row['Grade']}<br>
+                Verdict: {row['Verdict']}
+            """, max_width=200),
+            icon=folium.Icon(color=labels.colors[color], icon='home')
+        ).add_to(marker_cluster)
+    return marker_cluster
+
+
+def fast_marker_payload(df, labels=INDONESIA_LABELS):
+    """Compact rows [lat, lon, score, color, grade, verdict, id] plus the label lookup tables.
+
+    Grade and verdict travel as small integer codes; the strings are sent once.
+    """
+    grades = df['Grade'].astype('category')
+    verdicts = df['Verdict'].astype('category')
+    columns = [
+        np.round(df['Latitude'].to_numpy(dtype=float), 5).tolist(),
+        np.round(df['Longitude'].to_numpy(dtype=float), 5).tolist(),
+        np.round(df['AI_Score'].to_numpy(dtype=float), 2).tolist(),
+        labels.codes(df['AI_Score']).tolist(),
+        grades.cat.codes.tolist(),
+        verdicts.cat.codes.tolist(),
+        df['Location_ID'].astype(str).tolist(),
+    ]
+    lookups = {
+        'colors': labels.colors,
+        'grades': [str(g) for g in grades.cat.categories],
+        'verdicts': [str(v) for v in verdicts.cat.categories],
+    }
+    return [list(row) for row in zip(*columns)], lookups
+
+
+_FAST_CALLBACK = """
+var lookup = %s;
+var callback = function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 6, color: lookup.colors[row[3]], fillOpacity: 0.8, weight: 1
+    });
+    marker.bindPopup(function () {
+        return '<b>ID: ' + row[6] + '</b><br>Score: ' + row[2] +
+            '<br>Grade: ' + lookup.grades[row[4]] + '<br>Verdict: ' + lookup.verdicts[row[5]];
+    }, {maxWidth: 200});
+    return marker;
+};
+"""
+
+
+def add_fast_marker_layer(m, df):
+    """Scalable path: all points in one JSON array, markers built client-side by a JS callback."""
+    data, lookups = fast_marker_payload(df)
+    return FastMarkerCluster(
+        data,
+        callback=_FAST_CALLBACK % json.dumps(lookups),
+        chunkedLoading=True,
+    ).add_to(m)
+
+
+def add_location_layer(m, df, threshold=FAST_MAP_THRESHOLD):
+    """Pick the marker layer by row count."""
+    if len(df) > threshold:
+        return add_fast_marker_layer(m, df)
+    return add_marker_layer(m, df)
+
+
+class CellLayer(MacroElement):
+    """Aggregated grid cells drawn as circle markers sized by count and coloured by mean score."""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var data = {{ this.data|tojson }};
+                var layer = L.layerGroup();
+                var maxCount = Math.max.apply(null, data.map(function (c) { return c[2]; }).concat([1]));
+                for (var i = 0; i < data.length; i++) {
+                    var c = data[i];
+                    var s = Math.max(0, Math.min(100, c[3])) / 100;
+                    var color = 'rgb(' + Math.round(255 * (1 - s)) + ',' + Math.round(200 * s) + ',60)';
+                    L.circleMarker([c[0], c[1]], {
+                        radius: 4 + 16 * Math.sqrt(c[2] / maxCount),
+                        color: color, fillColor: color, fillOpacity: 0.6, weight: 1
+                    }).bindTooltip(c[2] + ' lokasi<br>Avg score: ' + c[3].toFixed(1)).addTo(layer);
+                }
+                layer.addTo({{ this._parent.get_name() }});
+                return layer;
+            })();
+        {% endmacro %}""")
+
+    def __init__(self, cells):
+        super().__init__()
+        self._name = 'CellLayer'
+        self.data = [list(row) for row in zip(
+            np.round(cells['latitude'].to_numpy(), 5).tolist(),
+            np.round(cells['longitude'].to_numpy(), 5).tolist(),
+            cells['count'].astype(int).tolist(),
+            np.round(cells['score_mean'].to_numpy(), 2).tolist(),
+        )]
+
+
+def add_grid_layer(m, pyramid, df, bbox, zoom, mask=None):
+    """Viewport-bounded layer: raw markers at high zoom, otherwise one circle per grid cell."""
+    kind, result = pyramid.query(bbox, zoom, df['AI_Score'].to_numpy(), mask)
+    if kind == 'points':
+        return add_location_layer(m, df.iloc[result])
+    return CellLayer(result).add_to(m)
+
+
+def viewport_from_folium(state, default_bbox, default_zoom):
+    """(bbox, zoom) from st_folium's returned 'bounds'/'zoom', or the defaults on first render."""
+    bounds = (state or {}).get('bounds') or {}
+    sw, ne = bounds.get('_southWest'), bounds.get('_northEast')
+    if not sw or not ne or sw.get('lat') is None:
+        return default_bbox, default_zoom
+    return (sw['lat'], sw['lng'], ne['lat'], ne['lng']), state.get('zoom') or default_zoom
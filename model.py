@@ -0,0 +1,147 @@
+"""Gradient-boosted (XGBoost) location-score model: training, persistence, batched inference.
+
+    python model.py train --dataset indonesia
+    python model.py train --dataset malaysia --rounds 300
+
+Learns the dataset's score column (AI_Score / location_score) from its raw feature
+columns and saves the booster under models/. Trees split on raw values, so no
+normalization stats are needed at inference time.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import xgboost as xgb
+
+from data_store import load_dataset
+from scoring import INDONESIA_FEATURES, MALAYSIA_FEATURES
+
+MODEL_DIR = 'models'
+PREDICT_BATCH = 1_000_000
+MIN_R2 = 0.2  # validation R² below this: the model has no usable predictive signal
+
+# dataset -> (data file, feature columns, target column). Malaysia's location_score is
+# uniform noise in the generator, so its model trains (R² ~ 0) but has_signal() rejects it.
+MODEL_SPECS = {
+    'indonesia': ('dummy.csv', INDONESIA_FEATURES, 'AI_Score'),
+    'malaysia': ('malaysia_fnb_branches_2000.csv', MALAYSIA_FEATURES + ['halal_certified_area'], 'location_score'),
+}
+
+DEFAULT_PARAMS = {
+    'objective': 'reg:squarederror',
+    'tree_method': 'hist',
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'nthread': os.cpu_count(),
+}
+
+
+def model_path(dataset):
+    return os.path.join(MODEL_DIR, f'{dataset}_xgb.ubj')
+
+
+def feature_array(df, columns):
+    """C-contiguous float32 (n, k) matrix, the layout inplace_predict consumes without a copy."""
+    X = np.empty((len(df), len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        X[:, j] = df[col].to_numpy(dtype=np.float32)
+    return X
+
+
+def train(X, y, params=None, num_rounds=200, valid_fraction=0.2, seed=42):
+    """Fit a hist booster on a random train/validation split. Returns (booster, metrics)."""
+    rng = np.random.default_rng(seed)
+    is_valid = rng.random(len(y)) < valid_fraction
+    params = {**DEFAULT_PARAMS, 'seed': seed, **(params or {})}
+
+    # QuantileDMatrix bins the features once instead of keeping a float copy per tree method
+    dtrain = xgb.QuantileDMatrix(X[~is_valid], y[~is_valid])
+    dvalid = xgb.QuantileDMatrix(X[is_valid], y[is_valid], ref=dtrain)
+    start = time.perf_counter()
+    booster = xgb.train(params, dtrain, num_rounds, evals=[(dvalid, 'valid')], verbose_eval=False)
+    seconds = time.perf_counter() - start
+
+    pred = predict(booster, X[is_valid])
+    resid = y[is_valid] - pred
+    total = ((y[is_valid] - y[is_valid].mean()) ** 2).sum()
+    metrics = {
+        'train_rows': int((~is_valid).sum()),
+        'valid_rows': int(is_valid.sum()),
+        'rmse': float(np.sqrt((resid ** 2).mean())) if len(resid) else float('nan'),
+        'r2': float(1 - (resid ** 2).sum() / total) if total > 0 else float('nan'),
+        'train_seconds': seconds,
+    }
+    return booster, metrics
+
+
+def save_model(booster, path, dataset, metrics=None):
+    columns = MODEL_SPECS[dataset][1]
+    booster.set_attr(dataset=dataset, features=','.join(columns), r2=str((metrics or {}).get('r2', float('nan'))))
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    booster.save_model(path)
+    return path
+
+
+def load_model(path):
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return booster
+
+
+def model_features(booster):
+    """Feature columns the booster was trained on, in order."""
+    features = booster.attr('features')
+    if features is None:
+        raise ValueError("booster has no 'features' attribute; retrain it with `python model.py train`")
+    return features.split(',')
+
+
+def has_signal(booster, min_r2=MIN_R2):
+    """True if the booster's validation R² (saved at training) reaches `min_r2`; unknown counts as no."""
+    r2 = float(booster.attr('r2') or 'nan')
+    return r2 >= min_r2
+
+
+def predict(booster, X, batch_rows=PREDICT_BATCH):
+    """Scores for a float32 feature matrix, predicted in row batches and clipped to 0-100."""
+    out = np.empty(len(X), dtype=np.float32)
+    for start in range(0, len(X), batch_rows):
+        stop = start + batch_rows
+        out[start:stop] = booster.inplace_predict(X[start:stop])
+    return np.clip(out, 0.0, 100.0, out=out)
+
+
+def load_or_train(dataset):
+    """The saved booster for `dataset`, training it first if models/ has none yet."""
+    path = model_path(dataset)
+    if not os.path.exists(path):
+        path, _ = train_dataset(dataset)
+    return load_model(path)
+
+
+def train_dataset(dataset, data_path=None, num_rounds=200, params=None):
+    """Train on a dataset file and save the booster to models/. Returns (path, metrics)."""
+    default_path, columns, target = MODEL_SPECS[dataset]
+    df = load_dataset(data_path or default_path, columns=columns + [target])
+    booster, metrics = train(feature_array(df, columns), df[target].to_numpy(dtype=np.float32),
+                             params, num_rounds)
+    return save_model(booster, model_path(dataset), dataset, metrics), metrics
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the XGBoost location-score model')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_train = sub.add_parser('train')
+    p_train.add_argument('--dataset', choices=sorted(MODEL_SPECS), default='indonesia')
+    p_train.add_argument('--data', default=None, help='Dataset file (default: the committed CSV)')
+    p_train.add_argument('--rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    path, metrics = train_dataset(args.dataset, args.data, args.rounds)
+    print(f"✅ Model saved: {path}")
+    print(f"   rows {metrics['train_rows']:,} train / {metrics['valid_rows']:,} valid, "
+          f"RMSE {metrics['rmse']:.3f}, R² {metrics['r2']:.3f}, {metrics['train_seconds']:.2f}s")
+    if not metrics['r2'] >= MIN_R2:
+        print(f"⚠️ R² below {MIN_R2}: the target is not learnable from these features, dashboards won't offer this model")
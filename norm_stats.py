@@ -0,0 +1,202 @@
+"""Persisted, versioned per-column normalization statistics.
+
+The artifact lives next to its dataset (dummy.csv -> dummy.stats.json) and
+records the dataset's content hash, so every process reuses the same min/max
+instead of refitting a scaler. Stats are mergeable: new rows can be folded in
+without rescanning the old ones.
+
+    python norm_stats.py build dummy.csv --dataset indonesia
+    python norm_stats.py update dummy.stats.json new_rows.csv [--source dummy.csv]
+
+`update` is for rows already appended to the dataset: the artifact is re-fingerprinted
+against the dataset (--source, default the file it was built from) so load_or_build
+keeps the merged stats instead of rebuilding them.
+"""
+import argparse
+import datetime
+import json
+import os
+
+import numpy as np
+
+from data_store import temp_path
+from scoring import SCORE_SPECS, feature_min_max, merge_min_max, normalize_with
+from sharding import file_sha256
+
+STATS_VERSION = 1
+STATS_SUFFIX = '.stats.json'
+
+
+def stats_path(data_path):
+    """dummy.csv -> dummy.stats.json"""
+    return os.path.splitext(data_path)[0] + STATS_SUFFIX
+
+
+def source_info(path):
+    stat = os.stat(path)
+    return {'file': os.path.basename(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_sha256(path)}
+
+
+class NormStats:
+    """Per-column min/max/count. `normalize()` is a pure transform, no fitting."""
+
+    def __init__(self, columns, min, max, count=0, revision=1, source=None):
+        self.columns = list(columns)
+        self.min = np.asarray(min, dtype=np.float64)
+        self.max = np.asarray(max, dtype=np.float64)
+        self.count = int(count)
+        self.revision = revision
+        self.source = source
+
+    @classmethod
+    def empty(cls, columns):
+        return cls(columns, np.full(len(columns), np.inf), np.full(len(columns), -np.inf), 0, revision=0)
+
+    @classmethod
+    def from_frame(cls, df, columns):
+        lo, hi = feature_min_max(df, columns)
+        return cls(columns, lo, hi, len(df))
+
+    @classmethod
+    def from_chunks(cls, chunks, columns):
+        stats = cls.empty(columns)
+        for chunk in chunks:
+            stats = stats.merge(cls.from_frame(chunk, columns))
+        stats.revision = 1
+        return stats
+
+    def merge(self, other):
+        """Stats of the union of both row sets (min/max/count are exactly mergeable)."""
+        if other.columns != self.columns:
+            raise ValueError(f"column mismatch: {self.columns} vs {other.columns}")
+        lo, hi = merge_min_max((self.min, self.max), (other.min, other.max))
+        return NormStats(self.columns, lo, hi, self.count + other.count, self.revision + 1, self.source)
+
+    def update(self, df):
+        """Fold new rows in without touching the old data."""
+        return self.merge(NormStats.from_frame(df, self.columns))
+
+    def normalize(self, df):
+        """[0, 1] float32 matrix; values outside the stored range are clipped so scores stay bounded."""
+        X = normalize_with(df, self.columns, self.min, self.max)
+        return np.clip(X, 0.0, 1.0, out=X)
+
+    def to_dict(self):
+        return {
+            'version': STATS_VERSION,
+            'revision': self.revision,
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'source': self.source,
+            'count': self.count,
+            'columns': {c: {'min': float(lo), 'max': float(hi)} for c, lo, hi in zip(self.columns, self.min, self.max)},
+        }
+
+    def save(self, path):
+        tmp = temp_path(path)
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, indent=2)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != STATS_VERSION:
+            raise ValueError(f"{path}: stats version {data.get('version')}, expected {STATS_VERSION}")
+        columns = list(data['columns'])
+        return cls(columns, [data['columns'][c]['min'] for c in columns], [data['columns'][c]['max'] for c in columns],
+                   data['count'], data['revision'], data.get('source'))
+
+    def matches(self, data_path):
+        """True if the artifact was built for the current content of `data_path`.
+
+        Size + mtime match is trusted; otherwise the content hash decides (a touched but
+        unchanged file still matches).
+        """
+        if not self.source or not os.path.exists(data_path):
+            return False
+        stat = os.stat(data_path)
+        if (self.source.get('size'), self.source.get('mtime_ns')) == (stat.st_size, stat.st_mtime_ns):
+            return True
+        return self.source.get('size') == stat.st_size and self.source.get('sha256') == file_sha256(data_path)
+
+
+def build(data_path, columns, chunk_rows=None):
+    """Stream the dataset once and save its stats artifact."""
+    from score_batch import CHUNK_ROWS, iter_chunks
+
+    stats = NormStats.from_chunks(iter_chunks(data_path, chunk_rows or CHUNK_ROWS, columns), columns)
+    stats.source = source_info(data_path)
+    stats.save(stats_path(data_path))
+    return stats
+
+
+def load_or_build(data_path, columns, df=None):
+    """Stats for `data_path`: the saved artifact if still valid, else rebuilt and saved.
+
+    Pass `df` when the data is already in memory to skip re-reading the file.
+    """
+    path = stats_path(data_path)
+    if os.path.exists(path):
+        try:
+            stats = NormStats.load(path)
+            if stats.columns == list(columns) and stats.matches(data_path):
+                return stats
+        except (ValueError, KeyError, json.JSONDecodeError):
+            pass
+    if df is None:
+        return build(data_path, columns)
+    stats = NormStats.from_frame(df, columns)
+    stats.source = source_info(data_path)
+    stats.save(path)
+    return stats
+
+
+def update(stats_file, new_rows, data_path=None):
+    """Fold the stats of `new_rows` into an artifact and re-fingerprint it to `data_path`.
+
+    `data_path` defaults to the dataset recorded in the artifact, next to it on disk.
+    """
+    from score_batch import iter_chunks
+
+    stats = NormStats.load(stats_file)
+    if data_path is None:
+        if not stats.source:
+            raise ValueError(f"{stats_file} records no source dataset; pass the dataset the merged stats describe")
+        data_path = os.path.join(os.path.dirname(stats_file), stats.source['file'])
+    if not os.path.exists(data_path):
+        raise ValueError(f"{data_path} not found; pass the dataset the merged stats describe")
+    stats = stats.merge(NormStats.from_chunks(iter_chunks(new_rows, columns=stats.columns), stats.columns))
+    stats.source = source_info(data_path)
+    stats.save(stats_file)
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build or update normalization stats artifacts')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p_build = sub.add_parser('build', help='Compute stats for a dataset (saved next to it)')
+    p_build.add_argument('data')
+    p_build.add_argument('--dataset', choices=sorted(SCORE_SPECS), default='indonesia')
+    p_update = sub.add_parser('update', help='Merge stats of new rows into an existing artifact')
+    p_update.add_argument('stats')
+    p_update.add_argument('new_rows')
+    p_update.add_argument('--source', default=None,
+                          help='Dataset the merged stats now describe (default: the one recorded in the artifact)')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        stats = build(args.data, SCORE_SPECS[args.dataset][0])
+        print(f"✅ {stats_path(args.data)}: {stats.count:,} rows, revision {stats.revision}")
+    else:
+        try:
+            stats = update(args.stats, args.new_rows, args.source)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"✅ {args.stats}: {stats.count:,} rows, revision {stats.revision}")
@@ -1,97 +1,184 @@
+import argparse
+import os
+
 import pandas as pd
 import numpy as np
 
-# Set random seed for reproducibility
-np.random.seed(42)
+from data_store import MALAYSIA_SCHEMA, columnar_path, save_columnar
+from sharding import file_sha256, part_filename, run_shards, spawn_seeds, write_manifest
+from spatial_index import add_competitor_features, enrich_csv_files
+
+OUTPUT_FILE = 'malaysia_fnb_branches_2000.csv'
+SEED = 42
 
-# Malaysian cities with accurate land-based coordinates
+# Malaysian cities with accurate land-based coordinates (state is used by the offline geocoder)
 cities_data = {
-    'Kuala Lumpur': {'lat': 3.1390, 'lon': 101.6869, 'count': 400},
-    'George Town': {'lat': 5.4164, 'lon': 100.3327, 'count': 250},
-    'Johor Bahru': {'lat': 1.4854, 'lon': 103.7618, 'count': 300},
-    'Kota Kinabalu': {'lat': 5.9788, 'lon': 118.0894, 'count': 200},
-    'Kuching': {'lat': 1.5533, 'lon': 110.3592, 'count': 200},
-    'Ipoh': {'lat': 4.5921, 'lon': 101.0901, 'count': 220},
-    'Shah Alam': {'lat': 3.0673, 'lon': 101.5186, 'count': 280},
-    'Petaling Jaya': {'lat': 3.1731, 'lon': 101.5897, 'count': 320},
-    'Subang Jaya': {'lat': 3.0456, 'lon': 101.5758, 'count': 250},
-    'Klang': {'lat': 3.0333, 'lon': 101.5500, 'count': 200},
-    'Seremban': {'lat': 2.7258, 'lon': 101.9424, 'count': 180},
-    'Melaka': {'lat': 2.1896, 'lon': 102.2501, 'count': 200},
-    'Alor Setar': {'lat': 6.1184, 'lon': 100.3688, 'count': 150},
-    'Kota Bharu': {'lat': 6.1756, 'lon': 102.2381, 'count': 170},
-    'Kuantan': {'lat': 3.8067, 'lon': 103.3256, 'count': 180},
-    'Putrajaya': {'lat': 2.7258, 'lon': 101.6964, 'count': 220},
-    'Cyberjaya': {'lat': 2.9264, 'lon': 101.6964, 'count': 200},
-    'Ampang': {'lat': 3.1520, 'lon': 101.5901, 'count': 250},
-    'Kajang': {'lat': 2.8386, 'lon': 101.7884, 'count': 200},
-    'Sungai Petani': {'lat': 5.6411, 'lon': 100.5036, 'count': 180},
-    'Sandakan': {'lat': 5.8250, 'lon': 118.1063, 'count': 120},
-    'Tawau': {'lat': 4.2571, 'lon': 117.8860, 'count': 120},
-    'Miri': {'lat': 4.3973, 'lon': 113.9849, 'count': 130},
-    'Sibu': {'lat': 2.3053, 'lon': 111.8252, 'count': 140},
-    'Bintulu': {'lat': 3.1883, 'lon': 113.0313, 'count': 120},
-    'Kangar': {'lat': 6.4349, 'lon': 100.2048, 'count': 100},
-    'Taiping': {'lat': 4.7433, 'lon': 100.7400, 'count': 130},
-    'Bukit Mertajam': {'lat': 5.3667, 'lon': 100.4667, 'count': 140},
-    'Butterworth': {'lat': 5.2833, 'lon': 100.3500, 'count': 150},
-    'Bandar Seri Begawan': {'lat': 4.8830, 'lon': 114.9430, 'count': 150},
+    'Kuala Lumpur': {'lat': 3.1390, 'lon': 101.6869, 'count': 400, 'state': 'W.P. Kuala Lumpur'},
+    'George Town': {'lat': 5.4164, 'lon': 100.3327, 'count': 250, 'state': 'Pulau Pinang'},
+    'Johor Bahru': {'lat': 1.4854, 'lon': 103.7618, 'count': 300, 'state': 'Johor'},
+    'Kota Kinabalu': {'lat': 5.9788, 'lon': 118.0894, 'count': 200, 'state': 'Sabah'},
+    'Kuching': {'lat': 1.5533, 'lon': 110.3592, 'count': 200, 'state': 'Sarawak'},
+    'Ipoh': {'lat': 4.5921, 'lon': 101.0901, 'count': 220, 'state': 'Perak'},
+    'Shah Alam': {'lat': 3.0673, 'lon': 101.5186, 'count': 280, 'state': 'Selangor'},
+    'Petaling Jaya': {'lat': 3.1731, 'lon': 101.5897, 'count': 320, 'state': 'Selangor'},
+    'Subang Jaya': {'lat': 3.0456, 'lon': 101.5758, 'count': 250, 'state': 'Selangor'},
+    'Klang': {'lat': 3.0333, 'lon': 101.5500, 'count': 200, 'state': 'Selangor'},
+    'Seremban': {'lat': 2.7258, 'lon': 101.9424, 'count': 180, 'state': 'Negeri Sembilan'},
+    'Melaka': {'lat': 2.1896, 'lon': 102.2501, 'count': 200, 'state': 'Melaka'},
+    'Alor Setar': {'lat': 6.1184, 'lon': 100.3688, 'count': 150, 'state': 'Kedah'},
+    'Kota Bharu': {'lat': 6.1756, 'lon': 102.2381, 'count': 170, 'state': 'Kelantan'},
+    'Kuantan': {'lat': 3.8067, 'lon': 103.3256, 'count': 180, 'state': 'Pahang'},
+    'Putrajaya': {'lat': 2.7258, 'lon': 101.6964, 'count': 220, 'state': 'W.P. Putrajaya'},
+    'Cyberjaya': {'lat': 2.9264, 'lon': 101.6964, 'count': 200, 'state': 'Selangor'},
+    'Ampang': {'lat': 3.1520, 'lon': 101.5901, 'count': 250, 'state': 'Selangor'},
+    'Kajang': {'lat': 2.8386, 'lon': 101.7884, 'count': 200, 'state': 'Selangor'},
+    'Sungai Petani': {'lat': 5.6411, 'lon': 100.5036, 'count': 180, 'state': 'Kedah'},
+    'Sandakan': {'lat': 5.8250, 'lon': 118.1063, 'count': 120, 'state': 'Sabah'},
+    'Tawau': {'lat': 4.2571, 'lon': 117.8860, 'count': 120, 'state': 'Sabah'},
+    'Miri': {'lat': 4.3973, 'lon': 113.9849, 'count': 130, 'state': 'Sarawak'},
+    'Sibu': {'lat': 2.3053, 'lon': 111.8252, 'count': 140, 'state': 'Sarawak'},
+    'Bintulu': {'lat': 3.1883, 'lon': 113.0313, 'count': 120, 'state': 'Sarawak'},
+    'Kangar': {'lat': 6.4349, 'lon': 100.2048, 'count': 100, 'state': 'Perlis'},
+    'Taiping': {'lat': 4.7433, 'lon': 100.7400, 'count': 130, 'state': 'Perak'},
+    'Bukit Mertajam': {'lat': 5.3667, 'lon': 100.4667, 'count': 140, 'state': 'Pulau Pinang'},
+    'Butterworth': {'lat': 5.2833, 'lon': 100.3500, 'count': 150, 'state': 'Pulau Pinang'},
+    'Bandar Seri Begawan': {'lat': 4.8830, 'lon': 114.9430, 'count': 150, 'state': 'Brunei-Muara'},
 }
 
-# Generate 5000 random locations clustered around cities
-data = []
-record_id = 1
 
-for city, city_info in cities_data.items():
-    city_lat = city_info['lat']
-    city_lon = city_info['lon']
+def generate_malaysia_dataset(output_file=OUTPUT_FILE, seed=SEED):
+    """Original single-process generator (global RNG, one row at a time)."""
+    # Set random seed for reproducibility
+    np.random.seed(seed)
+
+    # Generate 5000 random locations clustered around cities
+    data = []
+    record_id = 1
+
+    for city, city_info in cities_data.items():
+        city_lat = city_info['lat']
+        city_lon = city_info['lon']
+        count = city_info['count']
+
+        for _ in range(count):
+            # Create tight clusters around city centers (±0.02 degrees ≈ 2-3 km)
+            # This keeps points on land and within city boundaries
+            latitude = city_lat + np.random.normal(0, 0.015)
+            longitude = city_lon + np.random.normal(0, 0.015)
+
+            # Random metrics
+            population_density = np.random.randint(5000, 15000)
+            median_income_myr = np.random.randint(4000, 9000)
+            competitor_count = np.random.randint(5, 80)
+            mall_density_index = np.random.uniform(0.5, 4.0)
+            office_density_index = np.random.uniform(0.5, 5.0)
+            tourism_score = np.random.uniform(20, 85)
+            halal_certified_area = np.random.choice([0, 1], p=[0.3, 0.7])
+            location_score = np.random.uniform(20, 85)
+
+            data.append({
+                'branch_id': f'MY-{record_id:05d}',
+                'country': 'Malaysia',
+                'state': city_info['state'],
+                'city': city,
+                'latitude': latitude,
+                'longitude': longitude,
+                'population_density': population_density,
+                'median_income_myr': median_income_myr,
+                'competitor_count': competitor_count,
+                'mall_density_index': mall_density_index,
+                'office_density_index': office_density_index,
+                'tourism_score': tourism_score,
+                'halal_certified_area': halal_certified_area,
+                'location_score': location_score
+            })
+            record_id += 1
+
+    # Create DataFrame + competitor features from the real coordinates
+    df = add_competitor_features(pd.DataFrame(data), 'malaysia')
+
+    # Save to CSV + typed Parquet copy
+    df.to_csv(output_file, index=False)
+    save_columnar(df, output_file, MALAYSIA_SCHEMA)
+    return df
+
+
+def generate_city_rows(rng, city, city_info, start_id):
+    """Vectorized rows for one city, drawn from its own Generator."""
     count = city_info['count']
-    
-    for _ in range(count):
-        # Create tight clusters around city centers (±0.02 degrees ≈ 2-3 km)
-        # This keeps points on land and within city boundaries
-        latitude = city_lat + np.random.normal(0, 0.015)
-        longitude = city_lon + np.random.normal(0, 0.015)
-        
-        # Random metrics
-        population_density = np.random.randint(5000, 15000)
-        median_income_myr = np.random.randint(4000, 9000)
-        competitor_count = np.random.randint(5, 80)
-        mall_density_index = np.random.uniform(0.5, 4.0)
-        office_density_index = np.random.uniform(0.5, 5.0)
-        tourism_score = np.random.uniform(20, 85)
-        halal_certified_area = np.random.choice([0, 1], p=[0.3, 0.7])
-        location_score = np.random.uniform(20, 85)
-        
-        data.append({
-            'branch_id': f'MY-{record_id:05d}',
-            'country': 'Malaysia',
-            'state': 'Various',
-            'city': city,
-            'latitude': latitude,
-            'longitude': longitude,
-            'population_density': population_density,
-            'median_income_myr': median_income_myr,
-            'competitor_count': competitor_count,
-            'mall_density_index': mall_density_index,
-            'office_density_index': office_density_index,
-            'tourism_score': tourism_score,
-            'halal_certified_area': halal_certified_area,
-            'location_score': location_score
-        })
-        record_id += 1
-
-# Create DataFrame
-df = pd.DataFrame(data)
-
-# Save to CSV
-df.to_csv('malaysia_fnb_branches_2000.csv', index=False)
-
-print(f"✅ Dataset generated successfully!")
-print(f"📊 Total records: {len(df)}")
-print(f"\n📍 Records per city:")
-print(df['city'].value_counts().to_string())
-print(f"\n📈 Dataset Statistics:")
-print(f"   - Latitude range: {df['latitude'].min():.4f} to {df['latitude'].max():.4f}")
-print(f"   - Longitude range: {df['longitude'].min():.4f} to {df['longitude'].max():.4f}")
-print(f"   - Saved to: malaysia_fnb_branches_2000.csv")
+    return pd.DataFrame({
+        'branch_id': [f'MY-{i:05d}' for i in range(start_id, start_id + count)],
+        'country': 'Malaysia',
+        'state': city_info['state'],
+        'city': city,
+        'latitude': city_info['lat'] + rng.normal(0, 0.015, count),
+        'longitude': city_info['lon'] + rng.normal(0, 0.015, count),
+        'population_density': rng.integers(5000, 15000, count),
+        'median_income_myr': rng.integers(4000, 9000, count),
+        'competitor_count': rng.integers(5, 80, count),
+        'mall_density_index': rng.uniform(0.5, 4.0, count),
+        'office_density_index': rng.uniform(0.5, 5.0, count),
+        'tourism_score': rng.uniform(20, 85, count),
+        'halal_certified_area': rng.choice(2, size=count, p=[0.3, 0.7]),
+        'location_score': rng.uniform(20, 85, count),
+    })
+
+
+def _write_city_shard(task):
+    """Worker: one city per part-file."""
+    index, city, city_info, start_id, seed_seq, out_dir = task
+    df = generate_city_rows(np.random.default_rng(seed_seq), city, city_info, start_id)
+    filename = part_filename(index)
+    path = os.path.join(out_dir, filename)
+    df.to_csv(path, index=False)
+    return {'file': filename, 'city': city, 'start_id': start_id, 'rows': len(df)}
+
+
+def generate_malaysia_dataset_sharded(out_dir='malaysia_parts', seed=SEED, workers=None):
+    """Sharded mode: each city is a shard with its own SeedSequence child.
+
+    Output is byte-identical for a given seed regardless of `workers`. The competitor
+    features hold the coordinates of every shard in memory (two floats per row); the
+    rows themselves are rewritten one part at a time.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    seeds = spawn_seeds(seed, len(cities_data))
+
+    tasks = []
+    start_id = 1
+    for i, (city, city_info) in enumerate(cities_data.items()):
+        tasks.append((i, city, city_info, start_id, seeds[i], out_dir))
+        start_id += city_info['count']
+
+    parts = run_shards(_write_city_shard, tasks, workers)
+    # Neighbours cross city shards, so the features are added once every part is on disk
+    paths = [os.path.join(out_dir, p['file']) for p in parts]
+    enrich_csv_files(paths, 'malaysia')
+    parts = [{**p, 'sha256': file_sha256(path)} for p, path in zip(parts, paths)]
+    return write_manifest(out_dir, 'malaysia', seed, parts)
+
+
+def print_summary(df, output_file):
+    print(f"✅ Dataset generated successfully!")
+    print(f"📊 Total records: {len(df)}")
+    print(f"\n📍 Records per city:")
+    print(df['city'].value_counts().to_string())
+    print(f"\n📈 Dataset Statistics:")
+    print(f"   - Latitude range: {df['latitude'].min():.4f} to {df['latitude'].max():.4f}")
+    print(f"   - Longitude range: {df['longitude'].min():.4f} to {df['longitude'].max():.4f}")
+    print(f"   - Saved to: {output_file} (+ {columnar_path(output_file)})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate the Malaysia F&B branches dataset')
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--shards-dir', default=None, help='Sharded mode: write part-files + manifest here')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.shards_dir:
+        manifest = generate_malaysia_dataset_sharded(args.shards_dir, args.seed, args.workers)
+        print(f"✅ Sharded dataset written: {manifest}")
+    else:
+        print_summary(generate_malaysia_dataset(args.output, args.seed), args.output)
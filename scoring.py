@@ -0,0 +1,92 @@
+import numpy as np
+
+# Feature columns, the sidebar weight key for each, and its sign in the score
+INDONESIA_FEATURES = ['Traffic_Daily', 'Avg_Income', 'Rent_Per_Year', 'Competitors']
+INDONESIA_WEIGHT_KEYS = ['traffic', 'income', 'rent', 'competitor']
+INDONESIA_SIGNS = [1, 1, -1, -1]
+INDONESIA_DEFAULT_WEIGHTS = {'traffic': 0.5, 'income': 0.5, 'rent': 0.5, 'competitor': 0.5}
+
+MALAYSIA_FEATURES = ['population_density', 'median_income_myr', 'mall_density_index',
+                     'office_density_index', 'tourism_score', 'competitor_count']
+MALAYSIA_WEIGHT_KEYS = ['population', 'income', 'mall', 'office', 'tourism', 'competitor']
+MALAYSIA_SIGNS = [1, 1, 1, 1, 1, -1]
+MALAYSIA_DEFAULT_WEIGHTS = {'population': 0.3, 'income': 0.25, 'mall': 0.2, 'office': 0.15,
+                            'tourism': 0.1, 'competitor': 0.2}
+
+# dataset -> (features, weight keys, signs, default weights)
+SCORE_SPECS = {
+    'indonesia': (INDONESIA_FEATURES, INDONESIA_WEIGHT_KEYS, INDONESIA_SIGNS, INDONESIA_DEFAULT_WEIGHTS),
+    'malaysia': (MALAYSIA_FEATURES, MALAYSIA_WEIGHT_KEYS, MALAYSIA_SIGNS, MALAYSIA_DEFAULT_WEIGHTS),
+}
+
+
+def feature_min_max(df, columns):
+    """Per-column (min, max) as float64 arrays; empty frames give (+inf, -inf)."""
+    lo = np.array([df[c].to_numpy(dtype=np.float64).min(initial=np.inf) for c in columns])
+    hi = np.array([df[c].to_numpy(dtype=np.float64).max(initial=-np.inf) for c in columns])
+    return lo, hi
+
+
+def merge_min_max(a, b):
+    """Combine two (min, max) pairs, e.g. from different chunks."""
+    return np.minimum(a[0], b[0]), np.maximum(a[1], b[1])
+
+
+def normalize_with(df, columns, lo, hi):
+    """Min-max scale `columns` with the given stats as a C-contiguous float32 matrix."""
+    X = np.empty((len(df), len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        span = hi[j] - lo[j] if hi[j] > lo[j] else 1.0
+        X[:, j] = (df[col].to_numpy(dtype=np.float64) - lo[j]) / span
+    return X
+
+
+def normalize_features(df, columns):
+    """Min-max scale `columns` to [0, 1] (same as MinMaxScaler) as a C-contiguous float32 matrix.
+
+    Depends only on the data, so it is computed once per dataset and reused for every weight change.
+    """
+    return normalize_with(df, columns, *feature_min_max(df, columns))
+
+
+def weight_vector(weights, keys, signs):
+    """Signed weight vector in feature-column order."""
+    return np.asarray([weights[k] * s for k, s in zip(keys, signs)], dtype=np.float32)
+
+
+def raw_score(X, w):
+    return X @ w
+
+
+def rescale_0_100(raw, lo=None, hi=None):
+    """Min-max rescale a raw score vector to 0-100, rounded to 2 decimals.
+
+    `lo`/`hi` default to the vector's own range; pass a global range when scoring in chunks.
+    """
+    lo = raw.min(initial=np.inf) if lo is None else lo
+    hi = raw.max(initial=-np.inf) if hi is None else hi
+    if not hi > lo:
+        return np.zeros_like(raw)
+    out = raw - lo
+    out *= 100.0 / (hi - lo)
+    return np.round(out, 2, out=out)
+
+
+def weight_bounds(w):
+    """Range of X @ w over features in [0, 1]: (sum of negative weights, sum of positive weights)."""
+    w = np.asarray(w, dtype=np.float64)
+    return float(w[w < 0].sum()), float(w[w > 0].sum())
+
+
+def score(X, w):
+    """AI score for every row: one matrix-vector product plus the 0-100 rescale."""
+    return rescale_0_100(raw_score(X, w))
+
+
+def stable_score(X, w):
+    """AI score rescaled by the weights' theoretical range instead of the data's.
+
+    With X normalized by persisted stats (and clipped to [0, 1]) a row's score depends only on
+    its own features and the weights, not on which other rows are in the dataset.
+    """
+    return rescale_0_100(raw_score(X, w), *weight_bounds(w))
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def spawn_seeds(seed, num_shards):
+    """Child SeedSequence per shard. Shard i always gets the same stream for a given root seed."""
+    return np.random.SeedSequence(seed).spawn(num_shards)
+
+
+def part_filename(index, ext='csv'):
+    return f'part-{index:05d}.{ext}'
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def run_shards(fn, tasks, workers=None):
+    """Run `fn` over `tasks` on a process pool; results come back in task order."""
+    if workers is not None and workers <= 1:
+        return [fn(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, tasks))
+
+
+def write_manifest(out_dir, dataset, seed, parts, **extra):
+    """Write manifest.json describing the part-files (in order) of a sharded dataset."""
+    manifest = {
+        'dataset': dataset,
+        'seed': seed,
+        'total_rows': sum(p['rows'] for p in parts),
+        'num_parts': len(parts),
+        **extra,
+        'parts': parts,
+    }
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def read_manifest(out_dir):
+    with open(os.path.join(out_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_sharded(out_dir, workers=None, **read_kwargs):
+    """Read every part listed in the manifest in parallel and concatenate in order."""
+    manifest = read_manifest(out_dir)
+    paths = [os.path.join(out_dir, p['file']) for p in manifest['parts']]
+    # pd.read_csv releases the GIL in the C parser, threads are enough here
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(lambda p: pd.read_csv(p, **read_kwargs), paths))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from filter_index import _factorize
+from spatial_index import km_to_chord, to_unit_xyz
+
+MIN_BLOCK = 1024
+
+
+def _descending_blocks(scores, block):
+    """Row positions in descending score order (ties by position), `block` at a time.
+
+    Only a growing top slice is ever sorted (argpartition), so the cost tracks how
+    deep the greedy walk goes, not the full O(n log n) sort.
+    """
+    n = len(scores)
+    keys = np.where(np.isnan(scores), -np.inf, -scores)
+    seen = np.zeros(n, dtype=bool)
+    depth = min(block * 4, n)
+    while True:
+        top = np.argpartition(keys, depth - 1)[:depth] if depth < n else np.arange(n)
+        top = top[np.lexsort((top, keys[top]))]
+        # Ties at the partition boundary can swap members between rounds; skip what was already yielded
+        top = top[~seen[top]]
+        for start in range(0, len(top), block):
+            chunk = top[start:start + block]
+            seen[chunk] = True
+            yield chunk
+        if depth >= n:
+            return
+        depth = min(depth * 4, n)
+
+
+def select_sites(scores, lat, lon, k, min_km=0.0, city=None, per_city=None, block=None):
+    """Greedy top-`k` row positions by score, pairwise >= `min_km` apart and <= `per_city` per city.
+
+    Candidates are walked in descending score order in blocks. Each block is first
+    screened in one vectorized pass (full cities, KD-tree query against the sites
+    already chosen), and only the survivors are checked one by one against the
+    sites picked earlier in the same block. Returns positions in selection order.
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k}")
+    scores = np.asarray(scores, dtype=np.float64)
+    block = block or max(MIN_BLOCK, 4 * k)
+    if per_city is not None:
+        codes, categories = _factorize(city)
+        codes = np.asarray(codes)
+        taken = np.zeros(len(categories), dtype=np.int64)
+    spacing = min_km > 0
+    if spacing:
+        xyz = to_unit_xyz(lat, lon)
+        chord = float(km_to_chord(min_km))
+
+    chosen = []
+    tree = None
+    for candidates in _descending_blocks(scores, block):
+        candidates = candidates[~np.isnan(scores[candidates])]
+        if per_city is not None:
+            candidates = candidates[taken[codes[candidates]] < per_city]
+        if spacing and tree is not None and len(candidates):
+            dist, _ = tree.query(xyz[candidates], distance_upper_bound=chord)
+            candidates = candidates[dist >= chord]
+
+        picked = []
+        for i in candidates:
+            if per_city is not None and taken[codes[i]] >= per_city:
+                continue
+            if spacing and picked and (np.linalg.norm(xyz[picked] - xyz[i], axis=1) < chord).any():
+                continue
+            picked.append(i)
+            if per_city is not None:
+                taken[codes[i]] += 1
+            if len(chosen) + len(picked) == k:
+                break
+        chosen.extend(picked)
+        if len(chosen) == k or (per_city is not None and (taken >= per_city).all()):
+            break
+        if spacing and picked:
+            tree = cKDTree(xyz[chosen])
+    return np.asarray(chosen, dtype=np.int64)
+
+
+def select_frame(df, k, min_km=0.0, per_city=None, score_col='AI_Score', lat_col='latitude', lon_col='longitude',
+                 city_col='city'):
+    """Rows of `df` picked by select_sites, with a 1-based Rank column."""
+    positions = select_sites(df[score_col].to_numpy(), df[lat_col].to_numpy(), df[lon_col].to_numpy(), k,
+                             min_km, df[city_col] if per_city is not None else None, per_city)
+    picked = df.take(positions).reset_index(drop=True)
+    picked.insert(0, 'Rank', np.arange(1, len(picked) + 1))
+    return picked
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+# Rows are sorted once by their Z-order (Morton) key at MAX_LEVEL. A web-mercator
+# tile at any coarser zoom is then a contiguous run of that order, so each level
+# of the pyramid is just an array of run starts (O(cells) memory), and
+# aggregating a level is one gather + np.add.reduceat.
+MAX_LEVEL = 18
+CELL_ZOOM_OFFSET = 3  # cells are 1/8 of a map tile (32 px) at the current zoom
+RAW_POINTS_ZOOM = 14  # at or above this zoom, small viewports get raw points
+MAX_RAW_POINTS = 5000
+
+
+def tile_xy(lat, lon, level=MAX_LEVEL):
+    """Web-mercator tile coordinates of each point at `level` (uint32)."""
+    n = 2 ** level
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -85.05112878, 85.05112878)
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0 * n
+    y = (1.0 - np.arcsinh(np.tan(np.radians(lat))) / np.pi) / 2.0 * n
+    return (np.clip(x, 0, n - 1).astype(np.uint32),
+            np.clip(y, 0, n - 1).astype(np.uint32))
+
+
+def _spread_bits(v):
+    v = v.astype(np.uint64) & np.uint64(0xFFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333), (1, 0x5555555555555555)):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def morton_key(x, y):
+    """Interleave tile x/y bits; the key's top 2*z bits identify the tile at zoom z."""
+    return _spread_bits(x) | (_spread_bits(y) << np.uint64(1))
+
+
+def tile_bounds(x, y, level):
+    """(south, west, north, east) of tiles at `level`."""
+    n = 2.0 ** level
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / n))))
+    south = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + 1) / n))))
+    return south, west, north, east
+
+
+class GridPyramid:
+    """Multi-resolution tile aggregation index over latitude/longitude.
+
+    Build once per dataset; `cells()` / `query()` take per-row `values` (e.g. the
+    current AI score) and an optional boolean `mask` (current filters) in the
+    original row order, so weights and filters can change without a rebuild.
+    """
+
+    def __init__(self, lat, lon, max_level=MAX_LEVEL):
+        self.max_level = max_level
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        x, y = tile_xy(self.lat, self.lon, max_level)
+        keys = morton_key(x, y)
+        self.order = np.argsort(keys, kind='stable')
+        self._keys = keys[self.order]
+        self._x = x[self.order]
+        self._y = y[self.order]
+        self._levels = {}
+
+    def __len__(self):
+        return len(self.order)
+
+    def _level(self, level):
+        """(run starts, tile x, tile y) of every non-empty tile at `level`, built lazily."""
+        level = min(max(int(level), 0), self.max_level)
+        if level not in self._levels:
+            shift = np.uint64(2 * (self.max_level - level))
+            parent = self._keys >> shift
+            starts = np.flatnonzero(np.r_[True, parent[1:] != parent[:-1]]) if len(parent) else np.array([], int)
+            down = np.uint32(self.max_level - level)
+            self._levels[level] = (starts, self._x[starts] >> down, self._y[starts] >> down)
+        return level, self._levels[level]
+
+    def cells(self, level, values=None, mask=None, run_ids=None):
+        """Aggregate per tile at `level`: count, centroid, and score mean/min/max."""
+        level, (starts, tx, ty) = self._level(level)
+        ends = np.r_[starts[1:], len(self.order)]
+        if run_ids is not None:
+            starts, ends, tx, ty = starts[run_ids], ends[run_ids], tx[run_ids], ty[run_ids]
+        lengths = ends - starts
+        if lengths.sum() == 0:
+            return _empty_cells(level)
+
+        rows = self.order[_run_positions(starts, lengths)]
+        seg = np.r_[0, np.cumsum(lengths)[:-1]]
+
+        keep = np.ones(len(rows), dtype=bool) if mask is None else np.asarray(mask)[rows]
+        count = np.add.reduceat(keep.astype(np.int64), seg)
+        lat_sum = np.add.reduceat(np.where(keep, self.lat[rows], 0.0), seg)
+        lon_sum = np.add.reduceat(np.where(keep, self.lon[rows], 0.0), seg)
+        out = {'level': level, 'tile_x': tx, 'tile_y': ty, 'count': count}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out['latitude'] = lat_sum / count
+            out['longitude'] = lon_sum / count
+            if values is not None:
+                v = np.asarray(values, dtype=np.float64)[rows]
+                out['score_mean'] = np.add.reduceat(np.where(keep, v, 0.0), seg) / count
+                out['score_min'] = np.minimum.reduceat(np.where(keep, v, np.inf), seg)
+                out['score_max'] = np.maximum.reduceat(np.where(keep, v, -np.inf), seg)
+        cells = pd.DataFrame(out)
+        return cells[cells['count'] > 0].reset_index(drop=True)
+
+    def _viewport_runs(self, level, bbox):
+        """Indices of the tiles at `level` that intersect bbox = (south, west, north, east)."""
+        level, (starts, tx, ty) = self._level(level)
+        south, west, north, east = bbox
+        (x0, x1), (y1, y0) = tile_xy([south, north], [west, east], level)
+        return np.flatnonzero((tx >= x0) & (tx <= x1) & (ty >= y0) & (ty <= y1))
+
+    def query(self, bbox, zoom, values=None, mask=None,
+              raw_points_zoom=RAW_POINTS_ZOOM, max_raw_points=MAX_RAW_POINTS):
+        """What a map should draw for a viewport: ('points', row ids) or ('cells', frame).
+
+        Raw points are returned only at high zoom when few enough rows are visible;
+        otherwise tiles at `zoom + CELL_ZOOM_OFFSET` inside the viewport are aggregated,
+        which bounds the payload by screen size, not by row count.
+        """
+        level = min(int(zoom) + CELL_ZOOM_OFFSET, self.max_level)
+        runs = self._viewport_runs(level, bbox)
+        if zoom >= raw_points_zoom:
+            _, (starts, _, _) = self._level(level)
+            ends = np.r_[starts[1:], len(self.order)]
+            visible = (ends[runs] - starts[runs]).sum()
+            if visible <= max_raw_points:
+                rows = self.order[_run_positions(starts[runs], ends[runs] - starts[runs])]
+                if mask is not None:
+                    rows = rows[np.asarray(mask)[rows]]
+                south, west, north, east = bbox
+                inside = ((self.lat[rows] >= south) & (self.lat[rows] <= north) &
+                          (self.lon[rows] >= west) & (self.lon[rows] <= east))
+                return 'points', np.sort(rows[inside])
+        return 'cells', self.cells(level, values, mask, run_ids=runs)
+
+
+def _run_positions(starts, lengths):
+    """Concatenated positions of the runs [start, start + length)."""
+    offsets = np.r_[0, np.cumsum(lengths)[:-1]] if len(lengths) else np.array([], dtype=np.int64)
+    return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+
+def _empty_cells(level):
+    return pd.DataFrame({'level': pd.Series(dtype=int), 'tile_x': pd.Series(dtype=np.uint32),
+                         'tile_y': pd.Series(dtype=np.uint32), 'count': pd.Series(dtype=np.int64),
+                         'latitude': pd.Series(dtype=float), 'longitude': pd.Series(dtype=float),
+                         'score_mean': pd.Series(dtype=float), 'score_min': pd.Series(dtype=float),
+                         'score_max': pd.Series(dtype=float)})
+
+
+def bbox_of(lat, lon, pad=0.0):
+    """Bounding box (south, west, north, east) of a point set."""
+    return (float(np.min(lat)) - pad, float(np.min(lon)) - pad,
+            float(np.max(lat)) + pad, float(np.max(lon)) + pad)
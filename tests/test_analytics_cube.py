@@ -0,0 +1,49 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics_cube import AnalyticsCube, CubeBase
+
+VERDICTS = ['Tidak Cocok', 'Cocok', 'Sangat Cocok']
+
+
+@pytest.fixture(scope='module')
+def rows():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    scores = np.round(rng.uniform(0, 100, n), 2)
+    # Scores landing exactly on the bounds used below, including the clipped 100
+    scores[:40] = np.repeat([0.0, 40.0, 65.5, 100.0], 10)
+    city = rng.choice(np.array(['Kuala Lumpur', 'Penang', 'Johor Bahru', 'Ipoh']), n)
+    halal = rng.random(n) < 0.5
+    codes = np.digitize(scores, [40, 70])
+    income = rng.uniform(3000, 12000, n)
+    cube = AnalyticsCube(CubeBase(city, halal), scores, codes, VERDICTS, {'income': income})
+    return cube, scores, city, halal, codes, income
+
+
+@pytest.mark.parametrize('lo, hi', [(0.0, 100.0), (40.0, 70.0), (0.0, 40.0), (40.0, 40.0),
+                                    (12.25, 65.5), (65.5, 100.0), (99.5, 100.0)])
+def test_select_matches_row_filter(rows, lo, hi):
+    cube, scores, city, halal, codes, income = rows
+    cities, verdicts = ['Penang', 'Ipoh'], ['Cocok', 'Sangat Cocok']
+    mask = ((scores >= lo) & (scores <= hi) & np.isin(city, cities) & halal
+            & np.isin(np.asarray(VERDICTS)[codes], verdicts))
+
+    selection = cube.select(verdicts, cities, lo, hi, halal_only=True)
+    assert selection.sum() == mask.sum()
+    assert cube.city_counts(selection).sum() == mask.sum()
+
+    income_sum = cube.select(verdicts, cities, lo, hi, halal_only=True, measure='income').sum()
+    assert income_sum == pytest.approx(income[mask].sum())
+
+
+def test_score_histogram_includes_upper_bound(rows):
+    cube, scores, *_ = rows
+    histogram = cube.score_histogram(cube.select(lo=40.0, hi=100.0), 40.0)
+    assert histogram.sum() == ((scores >= 40) & (scores <= 100)).sum()
+    assert histogram.index[0] == '40-50'
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eda import column_ranges, profile_file
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet'])
+def test_sorted_input_has_no_under_or_overflow(tmp_path, suffix):
+    values = np.sort(np.random.default_rng(0).lognormal(3.0, 1.0, 5_000))
+    df = pd.DataFrame({'value': values, 'city': np.repeat(['A', 'B'], 2_500)})
+    path = str(tmp_path / f'sorted{suffix}')
+    df.to_csv(path, index=False) if suffix == '.csv' else df.to_parquet(path, index=False)
+
+    assert column_ranges(path, ['value'], chunk_rows=500)['value'] == pytest.approx((values[0], values[-1]))
+    edges, counts, under, over = profile_file(path, chunk_rows=500, workers=1).histogram('value')
+    assert under == over == 0
+    assert counts.sum() == len(values)
+    assert edges[0] == pytest.approx(values[0]) and edges[-1] == pytest.approx(values[-1])
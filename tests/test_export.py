@@ -0,0 +1,24 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import export_bytes, export_path, write_export
+
+
+def test_concurrent_exports_of_one_key(tmp_path):
+    df = pd.DataFrame({'Branch': [f'MY-{i:05d}' for i in range(20_000)], 'Score': np.arange(20_000) / 7})
+    path = export_path('same-key', 'parquet', str(tmp_path))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: write_export(df, path, 'parquet', chunk_rows=1_000), range(8)))
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+    pd.testing.assert_frame_equal(pd.read_parquet(path), df)
+
+
+def test_export_bytes(tmp_path):
+    df = pd.DataFrame({'a': [1, 2]})
+    assert export_bytes(df, 'csv', 'k', export_dir=str(tmp_path)) == b'"a"\n1\n2\n'
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geocoding import GeocodeCache, enrich_frame, resolve
+
+
+class FlakyBackend:
+    """Forward geocoder that fails every batch containing 'bad'."""
+    name = 'flaky'
+    rate = None
+    batch_size = 2
+
+    def forward_batch(self, queries):
+        if 'bad' in queries:
+            raise TimeoutError('backend timed out')
+        return [{'lat': 1.0, 'lon': float(len(q))} for q in queries]
+
+
+def test_failed_batch_left_unresolved_and_uncached(tmp_path):
+    cache = GeocodeCache(str(tmp_path / 'cache.sqlite'))
+    try:
+        places = resolve(FlakyBackend(), 'forward', ['a', 'bb', 'bad', 'cccc', 'dd'], cache, workers=2)
+        assert places == [{'lat': 1.0, 'lon': 1.0}, {'lat': 1.0, 'lon': 2.0}, None, None,
+                          {'lat': 1.0, 'lon': 2.0}]
+        assert len(cache) == 3
+    finally:
+        cache.close()
+
+
+def test_unknown_dataset_rejected():
+    with pytest.raises(ValueError, match='unknown dataset'):
+        enrich_frame(None, 'foo.csv', FlakyBackend())
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from labels import INDONESIA_LABELS
+from map_layers import fast_marker_payload
+
+
+def test_label_edges_belong_to_higher_band():
+    labels = INDONESIA_LABELS.label(pd.Series([54.9, 55.0, 70.0, 85.0]))
+    assert labels['Grade'].tolist() == ['D', 'C', 'B', 'A']
+
+
+def test_marker_colours_follow_live_scores():
+    df = pd.DataFrame({'Latitude': [-6.2, -6.3], 'Longitude': [106.8, 106.9], 'AI_Score': [90.0, 10.0],
+                       'Location_ID': ['ID_1', 'ID_2']})
+    df = df.join(INDONESIA_LABELS.label(df['AI_Score'])[['Grade', 'Verdict']])
+    rows, lookups = fast_marker_payload(df)
+    assert [lookups['colors'][row[3]] for row in rows] == ['green', 'red']
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import xgboost as xgb
+
+from model import has_signal, model_features, train
+
+
+def _booster(y_from_x):
+    rng = np.random.default_rng(0)
+    X = rng.random((2000, 3)).astype(np.float32)
+    y = (X @ np.array([50, 30, 20]) if y_from_x else rng.random(2000) * 100).astype(np.float32)
+    booster, metrics = train(X, y, num_rounds=30)
+    booster.set_attr(r2=str(metrics['r2']))
+    return booster
+
+
+def test_noise_target_has_no_signal():
+    assert not has_signal(_booster(y_from_x=False))
+    assert has_signal(_booster(y_from_x=True))
+
+
+def test_booster_without_metadata():
+    booster = xgb.train({}, xgb.DMatrix(np.zeros((4, 1)), label=np.zeros(4)), 1)
+    assert not has_signal(booster)
+    with pytest.raises(ValueError, match='features'):
+        model_features(booster)
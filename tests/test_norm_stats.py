@@ -0,0 +1,29 @@
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from norm_stats import build, load_or_build, stats_path, update
+from scoring import SCORE_SPECS
+
+COLUMNS = SCORE_SPECS['indonesia'][0]
+
+
+def test_update_keeps_merged_stats_valid(tmp_path):
+    data = str(tmp_path / 'dummy.csv')
+    shutil.copy(os.path.join(ROOT, 'dummy.csv'), data)
+    build(data, COLUMNS)
+
+    new_rows = pd.read_csv(data).head(10).assign(Traffic_Daily=10 ** 7)
+    new_rows.to_csv(tmp_path / 'new.csv', index=False)
+    new_rows.to_csv(data, mode='a', header=False, index=False)
+
+    merged = update(stats_path(data), str(tmp_path / 'new.csv'))
+    assert merged.revision == 2
+    loaded = load_or_build(data, COLUMNS)
+    assert loaded.revision == 2
+    assert loaded.max[COLUMNS.index('Traffic_Daily')] == 10 ** 7
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from norm_stats import NormStats
+from score_batch import iter_chunks, score_file
+from scoring import SCORE_SPECS
+
+DUMMY = os.path.join(ROOT, 'dummy.csv')
+
+
+def _stats(dataset):
+    columns = SCORE_SPECS[dataset][0]
+    return NormStats.from_chunks(iter_chunks(DUMMY, columns=columns), columns)
+
+
+def test_stats_for_other_dataset_rejected(tmp_path):
+    columns = SCORE_SPECS['malaysia'][0]
+    other = NormStats(columns, [0.0] * len(columns), [1.0] * len(columns))
+    with pytest.raises(ValueError, match='do not match the indonesia'):
+        score_file(DUMMY, str(tmp_path / 'out.csv'), 'indonesia', stats=other, log=lambda *_: None)
+
+
+def test_stats_column_order_checked(tmp_path):
+    stats = _stats('indonesia')
+    order = [3, 2, 1, 0]
+    swapped = NormStats([stats.columns[i] for i in order], stats.min[order], stats.max[order], stats.count)
+    with pytest.raises(ValueError, match='do not match'):
+        score_file(DUMMY, str(tmp_path / 'out.csv'), 'indonesia', stats=swapped, log=lambda *_: None)
+
+
+def test_matching_stats_accepted(tmp_path):
+    result = score_file(DUMMY, str(tmp_path / 'out.csv'), 'indonesia', stats=_stats('indonesia'), log=lambda *_: None)
+    assert result['rows'] > 0
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from site_selection import select_sites
+
+
+def _points(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 100, n), rng.uniform(1.0, 6.5, n), rng.uniform(100.0, 104.0, n)
+
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_k_below_one_rejected(k):
+    scores, lat, lon = _points()
+    with pytest.raises(ValueError, match='k must be at least 1'):
+        select_sites(scores, lat, lon, k)
+
+
+def test_top_k_without_constraints():
+    scores, lat, lon = _points()
+    picked = select_sites(scores, lat, lon, 5)
+    np.testing.assert_array_equal(picked, np.argsort(-scores, kind='stable')[:5])
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import folium
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map_layers import add_grid_layer
+from spatial_grid import GridPyramid
+
+EMPTY_BBOX = (-60.0, -170.0, -50.0, -160.0)
+
+
+def _points(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(1.0, 6.5, n)
+    lon = rng.uniform(100.0, 104.0, n)
+    return lat, lon, pd.DataFrame({'Latitude': lat, 'Longitude': lon,
+                                   'AI_Score': rng.uniform(0, 100, n)})
+
+
+def test_empty_cells_keep_score_columns():
+    lat, lon, df = _points()
+    cells = GridPyramid(lat, lon).cells(8, df['AI_Score'].to_numpy(), run_ids=np.array([], dtype=int))
+    assert cells.empty
+    assert {'score_mean', 'score_min', 'score_max'} <= set(cells.columns)
+
+
+def test_empty_viewport_query():
+    lat, lon, df = _points()
+    kind, cells = GridPyramid(lat, lon).query(EMPTY_BBOX, 8, df['AI_Score'].to_numpy())
+    assert kind == 'cells'
+    assert cells.empty
+    assert cells['score_mean'].dtype == float
+
+
+def test_grid_layer_on_empty_viewport():
+    lat, lon, df = _points()
+    m = folium.Map(location=[4.0, 102.0], zoom_start=8)
+    layer = add_grid_layer(m, GridPyramid(lat, lon), df, EMPTY_BBOX, 8)
+    assert layer.data == []
+    m.get_root().render()
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import INDONESIA_SCHEMA, MALAYSIA_SCHEMA, dataset_for
+from spatial_index import (add_competitor_features, competitor_features, enrich_csv_files, feature_columns,
+                           feature_schema)
+
+COORDS = {'latitude': [3.139, 3.140, 3.150, 3.160], 'longitude': [101.687, 101.688, 101.690, 101.700]}
+
+
+def test_single_branch_has_no_neighbour_features():
+    features = competitor_features([3.139], [101.687])
+    assert features['within'].tolist() == [0]
+    for key in ('nearest', 'knn_mean', 'cannibalization'):
+        assert np.isnan(features[key]).all()
+
+
+def test_default_feature_columns_in_schemas():
+    assert set(feature_columns('indonesia').values()) <= set(INDONESIA_SCHEMA)
+    assert set(feature_columns('malaysia').values()) <= set(MALAYSIA_SCHEMA)
+
+
+def test_feature_columns_follow_radius_and_k():
+    names = feature_columns('malaysia', radius_km=2.5, k=3)
+    assert names == {'within': 'branches_within_2.5km', 'nearest': 'nearest_branch_km',
+                     'knn_mean': 'knn3_mean_km', 'cannibalization': 'cannibalization_score_2.5km_k3'}
+    enriched = add_competitor_features(pd.DataFrame(COORDS), 'malaysia', radius_km=2.5, k=3)
+    assert set(names.values()) <= set(enriched.columns)
+    assert not set(feature_columns('malaysia').values()) - {'nearest_branch_km'} & set(enriched.columns)
+    assert feature_schema('malaysia', 2.5, 3)['branches_within_2.5km'] == 'int32'
+
+
+def test_unknown_dataset_rejected(tmp_path):
+    with pytest.raises(ValueError, match='unknown dataset'):
+        add_competitor_features(pd.DataFrame(COORDS), 'foo.csv')
+    with pytest.raises(ValueError, match='pass the dataset'):
+        dataset_for(str(tmp_path / 'foo.csv'))
+
+
+def test_enrich_files_uses_neighbours_across_files(tmp_path):
+    df = pd.DataFrame(COORDS)
+    paths = [str(tmp_path / 'a.csv'), str(tmp_path / 'b.csv')]
+    df.iloc[:2].to_csv(paths[0], index=False)
+    df.iloc[2:].to_csv(paths[1], index=False)
+    assert enrich_csv_files(paths, 'malaysia', block_bytes=64) == [2, 2]
+    merged = pd.concat([pd.read_csv(p) for p in paths], ignore_index=True)
+    expected = add_competitor_features(df, 'malaysia')
+    pd.testing.assert_frame_equal(merged, expected, check_dtype=False)
+    assert sorted(os.listdir(tmp_path)) == ['a.csv', 'b.csv']